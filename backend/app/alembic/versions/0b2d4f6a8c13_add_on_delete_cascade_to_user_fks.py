@@ -0,0 +1,40 @@
+"""Add on delete cascade to user foreign keys
+
+Revision ID: 0b2d4f6a8c13
+Revises: f1a3c5e7b9d2
+Create Date: 2025-05-16 13:21:44.870259
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '0b2d4f6a8c13'
+down_revision = 'f1a3c5e7b9d2'
+branch_labels = None
+depends_on = None
+
+FOREIGN_KEYS = (
+    ('profile', 'user_id'),
+    ('availability', 'nutritionist_id'),
+    ('appointment', 'client_id'),
+    ('appointment', 'nutritionist_id'),
+    ('nutritionrecord', 'client_id'),
+    ('nutritionrecord', 'created_by_id'),
+)
+
+
+def upgrade():
+    for table, column in FOREIGN_KEYS:
+        name = f'{table}_{column}_fkey'
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, 'user', [column], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    for table, column in FOREIGN_KEYS:
+        name = f'{table}_{column}_fkey'
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, 'user', [column], ['id'])
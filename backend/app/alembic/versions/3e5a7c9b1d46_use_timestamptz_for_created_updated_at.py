@@ -0,0 +1,44 @@
+"""Use timestamptz for created_at and updated_at
+
+Revision ID: 3e5a7c9b1d46
+Revises: 0b2d4f6a8c13
+Create Date: 2025-05-20 10:37:09.218574
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '3e5a7c9b1d46'
+down_revision = '0b2d4f6a8c13'
+branch_labels = None
+depends_on = None
+
+TABLES = ('profile', 'availability', 'appointment', 'nutritionrecord')
+COLUMNS = ('created_at', 'updated_at')
+
+
+def upgrade():
+    for table in TABLES:
+        for column in COLUMNS:
+            op.alter_column(
+                table, column,
+                type_=sa.DateTime(timezone=True),
+                existing_type=sa.Date(),
+                server_default=sa.text('now()'),
+                postgresql_using=f'{column}::timestamptz',
+            )
+
+
+def downgrade():
+    for table in TABLES:
+        for column in COLUMNS:
+            op.alter_column(
+                table, column,
+                type_=sa.Date(),
+                existing_type=sa.DateTime(timezone=True),
+                server_default=sa.text('CURRENT_DATE'),
+                postgresql_using=f'{column}::date',
+            )
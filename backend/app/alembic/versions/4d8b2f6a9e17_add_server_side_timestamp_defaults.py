@@ -0,0 +1,31 @@
+"""Add server side timestamp defaults
+
+Revision ID: 4d8b2f6a9e17
+Revises: c3d9a7e15f42
+Create Date: 2025-04-28 10:12:47.381205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '4d8b2f6a9e17'
+down_revision = 'c3d9a7e15f42'
+branch_labels = None
+depends_on = None
+
+TABLES = ('profile', 'availability', 'appointment', 'nutritionrecord')
+
+
+def upgrade():
+    for table in TABLES:
+        op.alter_column(table, 'created_at', server_default=sa.text('CURRENT_DATE'))
+        op.alter_column(table, 'updated_at', server_default=sa.text('CURRENT_DATE'))
+
+
+def downgrade():
+    for table in TABLES:
+        op.alter_column(table, 'updated_at', server_default=None)
+        op.alter_column(table, 'created_at', server_default=None)
@@ -0,0 +1,46 @@
+"""Add appointment and availability indexes
+
+Revision ID: 5b7e2c9d4f13
+Revises: 03fa3e7c5d2a
+Create Date: 2025-04-18 10:12:47.530214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e2c9d4f13'
+down_revision = '03fa3e7c5d2a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_appt_nutri_date_status', 'appointment',
+        ['nutritionist_id', 'date', 'status'],
+        postgresql_where=sa.text("status = 'SCHEDULED'")
+    )
+    op.create_index(
+        'ix_appt_client_date', 'appointment',
+        ['client_id', sa.text('date DESC')]
+    )
+    op.create_index(
+        'ix_avail_nutri_dow', 'availability',
+        ['nutritionist_id', 'day_of_week'],
+        postgresql_where=sa.text('is_recurring')
+    )
+    op.create_index(
+        'ix_avail_nutri_specific', 'availability',
+        ['nutritionist_id', 'specific_date'],
+        postgresql_where=sa.text('NOT is_recurring')
+    )
+
+
+def downgrade():
+    op.drop_index('ix_avail_nutri_specific', table_name='availability')
+    op.drop_index('ix_avail_nutri_dow', table_name='availability')
+    op.drop_index('ix_appt_client_date', table_name='appointment')
+    op.drop_index('ix_appt_nutri_date_status', table_name='appointment')
@@ -0,0 +1,48 @@
+"""Maintain updated_at with a trigger and make the timestamps not null
+
+Revision ID: 6c2e8a4f0b17
+Revises: 3e5a7c9b1d46
+Create Date: 2025-05-22 14:12:48.306519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '6c2e8a4f0b17'
+down_revision = '3e5a7c9b1d46'
+branch_labels = None
+depends_on = None
+
+TABLES = ('profile', 'availability', 'appointment', 'nutritionrecord')
+
+
+def upgrade():
+    # Bulk UPDATE statements and raw SQL skip the ORM's onupdate, set it in the database
+    op.execute(
+        "CREATE FUNCTION set_updated_at() RETURNS trigger AS $$ "
+        "BEGIN NEW.updated_at = now(); RETURN NEW; END; "
+        "$$ LANGUAGE plpgsql"
+    )
+    for table in TABLES:
+        # Rows written before the server defaults existed can still hold NULLs
+        op.execute(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL")
+        op.execute(
+            f"UPDATE {table} SET updated_at = created_at WHERE updated_at IS NULL"
+        )
+        op.alter_column(table, 'created_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+        op.alter_column(table, 'updated_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+        op.execute(
+            f"CREATE TRIGGER {table}_set_updated_at BEFORE UPDATE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION set_updated_at()"
+        )
+
+
+def downgrade():
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER {table}_set_updated_at ON {table}")
+        op.alter_column(table, 'updated_at', existing_type=sa.DateTime(timezone=True), nullable=True)
+        op.alter_column(table, 'created_at', existing_type=sa.DateTime(timezone=True), nullable=True)
+    op.execute("DROP FUNCTION set_updated_at()")
@@ -0,0 +1,25 @@
+"""Add unique profile user index
+
+Revision ID: 7a1e3c5b9d24
+Revises: 4d8b2f6a9e17
+Create Date: 2025-05-02 14:36:05.927413
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '7a1e3c5b9d24'
+down_revision = '4d8b2f6a9e17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_profile_user', 'profile', ['user_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_profile_user', table_name='profile')
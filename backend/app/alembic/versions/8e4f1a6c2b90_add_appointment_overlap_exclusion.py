@@ -0,0 +1,52 @@
+"""Add appointment overlap exclusion constraint
+
+Revision ID: 8e4f1a6c2b90
+Revises: 5b7e2c9d4f13
+Create Date: 2025-04-19 16:40:05.118372
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4f1a6c2b90'
+down_revision = '5b7e2c9d4f13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bookings made before this constraint could overlap under concurrent requests,
+    # the constraint can't be added over them, so stop and list them instead
+    if not context.is_offline_mode():
+        overlaps = op.get_bind().execute(sa.text(
+            "SELECT a.id, b.id FROM appointment a "
+            "JOIN appointment b ON b.nutritionist_id = a.nutritionist_id "
+            "AND b.date = a.date AND b.id > a.id "
+            "AND b.start_time < a.end_time AND a.start_time < b.end_time "
+            "WHERE a.status = 'SCHEDULED' AND b.status = 'SCHEDULED' "
+            "ORDER BY a.id, b.id"
+        )).all()
+        if overlaps:
+            pairs = "\n".join(f"  {first} overlaps {second}" for first, second in overlaps)
+            raise RuntimeError(
+                "Cannot add appointment_no_overlap, these scheduled appointments overlap:\n"
+                f"{pairs}\n"
+                "Cancel or reschedule one appointment of each pair, then rerun the migration."
+            )
+
+    # btree_gist provides the equality operator class for uuid in a GiST index
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        "ALTER TABLE appointment ADD CONSTRAINT appointment_no_overlap "
+        "EXCLUDE USING gist ("
+        "nutritionist_id WITH =, "
+        "tsrange(date + start_time, date + end_time, '[)') WITH &&"
+        ") WHERE (status = 'SCHEDULED')"
+    )
+
+
+def downgrade():
+    op.drop_constraint('appointment_no_overlap', 'appointment')
@@ -0,0 +1,36 @@
+"""Add generated bmi column
+
+Revision ID: b6f0d2e84a31
+Revises: 7a1e3c5b9d24
+Create Date: 2025-05-06 11:04:52.115836
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6f0d2e84a31'
+down_revision = '7a1e3c5b9d24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'nutritionrecord',
+        sa.Column(
+            'bmi',
+            sa.Float(),
+            sa.Computed(
+                'CASE WHEN height > 0 AND weight <> 0 THEN weight / (height * height) END',
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade():
+    op.drop_column('nutritionrecord', 'bmi')
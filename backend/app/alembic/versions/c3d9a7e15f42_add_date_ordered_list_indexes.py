@@ -0,0 +1,44 @@
+"""Add date ordered list indexes
+
+Revision ID: c3d9a7e15f42
+Revises: 8e4f1a6c2b90
+Create Date: 2025-04-24 09:31:18.664920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d9a7e15f42'
+down_revision = '8e4f1a6c2b90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_nutritionrecord_client_date', 'nutritionrecord',
+        ['client_id', sa.text('date DESC')]
+    )
+    op.create_index(
+        'ix_appointment_nutr_date_time', 'appointment',
+        ['nutritionist_id', 'date', 'start_time']
+    )
+    # Supersedes (client_id, date DESC), it also covers the start_time tie-break
+    op.create_index(
+        'ix_appointment_client_date_time', 'appointment',
+        ['client_id', 'date', 'start_time']
+    )
+    op.drop_index('ix_appt_client_date', table_name='appointment')
+
+
+def downgrade():
+    op.create_index(
+        'ix_appt_client_date', 'appointment',
+        ['client_id', sa.text('date DESC')]
+    )
+    op.drop_index('ix_appointment_client_date_time', table_name='appointment')
+    op.drop_index('ix_appointment_nutr_date_time', table_name='appointment')
+    op.drop_index('ix_nutritionrecord_client_date', table_name='nutritionrecord')
@@ -0,0 +1,31 @@
+"""Add server side uuid defaults
+
+Revision ID: e5c7a9b1d3f8
+Revises: b6f0d2e84a31
+Create Date: 2025-05-09 16:47:21.503362
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5c7a9b1d3f8'
+down_revision = 'b6f0d2e84a31'
+branch_labels = None
+depends_on = None
+
+TABLES = ('user', 'item', 'profile', 'availability', 'appointment', 'nutritionrecord')
+
+
+def upgrade():
+    # gen_random_uuid() is built in from Postgres 13, pgcrypto provides it before that
+    op.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto")
+    for table in TABLES:
+        op.alter_column(table, 'id', server_default=sa.text('gen_random_uuid()'))
+
+
+def downgrade():
+    for table in TABLES:
+        op.alter_column(table, 'id', server_default=None)
@@ -0,0 +1,34 @@
+"""Set fillfactor on frequently updated tables
+
+Revision ID: f1a3c5e7b9d2
+Revises: e5c7a9b1d3f8
+Create Date: 2025-05-13 09:58:30.642117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a3c5e7b9d2'
+down_revision = 'e5c7a9b1d3f8'
+branch_labels = None
+depends_on = None
+
+TABLES = ('appointment', 'nutritionrecord', 'profile')
+
+
+def upgrade():
+    # Leave room in each page so updates that don't touch an indexed column stay HOT.
+    # Only pages written from now on use it, existing data is repacked by the next
+    # VACUUM FULL / pg_repack in a maintenance window.
+    for table in TABLES:
+        op.execute(
+            f"ALTER TABLE {table} SET (fillfactor = 80, autovacuum_vacuum_scale_factor = 0.05)"
+        )
+
+
+def downgrade():
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} RESET (fillfactor, autovacuum_vacuum_scale_factor)")
@@ -19,8 +19,15 @@ reusable_oauth2 = OAuth2PasswordBearer(
 
 
 def get_db() -> Generator[Session, None, None]:
+    # One transaction per request: crud mutators only flush, the request commits once
     with Session(engine) as session:
-        yield session
+        try:
+            yield session
+        except Exception:
+            session.rollback()
+            raise
+        else:
+            session.commit()
 
 
 SessionDep = Annotated[Session, Depends(get_db)]
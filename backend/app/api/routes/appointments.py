@@ -1,18 +1,21 @@
 import uuid
-from datetime import date, datetime
+from datetime import date, datetime, timezone
 from typing import Any, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from psycopg import errors
+from sqlalchemy.exc import IntegrityError
 
 from app import crud
 from app.api.deps import CurrentUser, SessionDep
+from app.core.config import settings
 from app.models import (
     AppointmentCreate, AppointmentPublic,
     AppointmentStatus, AppointmentUpdate, AppointmentsPublic,
     Message, UserType
 )
 from app.utils import send_email, generate_appointment_email, generate_appointment_update_email, \
-    generate_cancellation_email
+    generate_cancellation_email, page_response
 
 router = APIRouter(tags=["appointments"])
 
@@ -22,12 +25,17 @@ def create_appointment(
         appointment_in: AppointmentCreate,
         current_user: CurrentUser,
         session: SessionDep,
+        background_tasks: BackgroundTasks,
 ) -> Any:
     """
     Book a new appointment with a nutritionist.
     """
-    # Check if the nutritionist exists and is a nutritionist
-    nutritionist = crud.get_user_by_id(
+    # Appointment dates and times are stored as UTC wall-clock values
+    now = datetime.now(timezone.utc)
+
+    # Check if the nutritionist exists and is a nutritionist, reading the row itself
+    # and keeping it locked so it can't be deleted or demoted before the commit
+    nutritionist = crud.get_user_for_share(
         session=session,
         user_id=appointment_in.nutritionist_id
     )
@@ -47,62 +55,35 @@ def create_appointment(
     # Check if the appointment time is in the future
     appointment_datetime = datetime.combine(
         appointment_in.date,
-        appointment_in.start_time
+        appointment_in.start_time,
+        tzinfo=timezone.utc
     )
-    if appointment_datetime < datetime.now():
+    if appointment_datetime < now:
         raise HTTPException(
             status_code=400,
             detail="Appointment time must be in the future"
         )
 
-    # Check if the appointment time is available
-    # First, get all appointments for the nutritionist on that day
-    day_start = appointment_in.date
-    day_end = appointment_in.date
-    existing_appointments = crud.get_appointments_by_date_range(
+    # Hold the nutritionist's day until the appointment is committed
+    crud.lock_nutritionist_day(
         session=session,
         nutritionist_id=appointment_in.nutritionist_id,
-        start_date=day_start,
-        end_date=day_end,
-        status=AppointmentStatus.SCHEDULED
+        date=appointment_in.date
     )
 
-    # Check for time conflicts
-    for existing_appt in existing_appointments:
-        if (
-                (appointment_in.start_time >= existing_appt.start_time and
-                 appointment_in.start_time < existing_appt.end_time) or
-                (appointment_in.end_time > existing_appt.start_time and
-                 appointment_in.end_time <= existing_appt.end_time) or
-                (appointment_in.start_time <= existing_appt.start_time and
-                 appointment_in.end_time >= existing_appt.end_time)
-        ):
-            raise HTTPException(
-                status_code=400,
-                detail="The selected time slot is already booked"
-            )
-
-    # Check if the time slot is within the nutritionist's availability
-    weekday = appointment_in.date.weekday()
-    availabilities = crud.get_availabilities_by_date_range(
+    # Check for time conflicts and availability in one query
+    has_conflict, is_available = crud.check_slot_bookable(
         session=session,
         nutritionist_id=appointment_in.nutritionist_id,
-        start_date=day_start,
-        end_date=day_end
+        date=appointment_in.date,
+        start_time=appointment_in.start_time,
+        end_time=appointment_in.end_time
     )
-
-    # Check if the appointment time falls within any of the nutritionist's available slots
-    is_available = False
-    for avail in availabilities:
-        if (avail.is_recurring and avail.day_of_week == weekday) or (
-                not avail.is_recurring and avail.specific_date == appointment_in.date
-        ):
-            if (
-                    appointment_in.start_time >= avail.start_time and
-                    appointment_in.end_time <= avail.end_time
-            ):
-                is_available = True
-                break
+    if has_conflict:
+        raise HTTPException(
+            status_code=400,
+            detail="The selected time slot is already booked"
+        )
 
     if not is_available:
         raise HTTPException(
@@ -110,41 +91,56 @@ def create_appointment(
             detail="The selected time slot is not available"
         )
 
-    # Create the appointment
-    appointment = crud.create_appointment(
-        session=session,
-        appointment_in=appointment_in,
-        client_id=current_user.id
-    )
-
-    # Send confirmation emails to both client and nutritionist
+    # Create the appointment, the exclusion constraint rejects any overlap that slipped through
     try:
-        # Send to client
-        client_email_data = generate_appointment_email(
-            is_client=True,
-            appointment=appointment,
-            nutritionist_name=nutritionist.full_name or nutritionist.email
+        appointment = crud.create_appointment(
+            session=session,
+            appointment_in=appointment_in,
+            client_id=current_user.id
         )
-        send_email(
-            email_to=current_user.email,
-            subject=client_email_data.subject,
-            html_content=client_email_data.html_content
+    except IntegrityError as e:
+        session.rollback()
+        if isinstance(e.orig, errors.ForeignKeyViolation):
+            raise HTTPException(
+                status_code=404,
+                detail="Nutritionist not found"
+            )
+        raise HTTPException(
+            status_code=400,
+            detail="The selected time slot is already booked"
         )
 
-        # Send to nutritionist
-        nutritionist_email_data = generate_appointment_email(
-            is_client=False,
-            appointment=appointment,
-            client_name=current_user.full_name or current_user.email
-        )
-        send_email(
-            email_to=nutritionist.email,
-            subject=nutritionist_email_data.subject,
-            html_content=nutritionist_email_data.html_content
-        )
-    except Exception:
-        # If email sending fails, continue anyway
-        pass
+    # Queue confirmation emails to both client and nutritionist, delivered after the response is sent
+    if settings.emails_enabled:
+        try:
+            # Send to client
+            client_email_data = generate_appointment_email(
+                is_client=True,
+                appointment=appointment,
+                nutritionist_name=nutritionist.full_name or nutritionist.email
+            )
+            background_tasks.add_task(
+                send_email,
+                email_to=current_user.email,
+                subject=client_email_data.subject,
+                html_content=client_email_data.html_content
+            )
+
+            # Send to nutritionist
+            nutritionist_email_data = generate_appointment_email(
+                is_client=False,
+                appointment=appointment,
+                client_name=current_user.full_name or current_user.email
+            )
+            background_tasks.add_task(
+                send_email,
+                email_to=nutritionist.email,
+                subject=nutritionist_email_data.subject,
+                html_content=nutritionist_email_data.html_content
+            )
+        except Exception:
+            # If rendering the emails fails, continue anyway
+            pass
 
     return appointment
 
@@ -162,35 +158,29 @@ def read_appointments(
     """
     if current_user.user_type == UserType.NUTRITIONIST:
         # Get appointments as nutritionist
-        appointments = crud.get_appointments_by_nutritionist(
+        appointments, count = crud.get_appointments_by_nutritionist(
             session=session,
             nutritionist_id=current_user.id,
             skip=skip,
-            limit=limit
-        )
-        count = crud.get_appointments_count_by_nutritionist(
-            session=session,
-            nutritionist_id=current_user.id
+            limit=limit,
+            status=status
         )
     else:
         # Get appointments as client
-        appointments = crud.get_appointments_by_client(
+        appointments, count = crud.get_appointments_by_client(
             session=session,
             client_id=current_user.id,
             skip=skip,
-            limit=limit
-        )
-        count = crud.get_appointments_count_by_client(
-            session=session,
-            client_id=current_user.id
+            limit=limit,
+            status=status
         )
 
-    # Filter by status if specified
-    if status:
-        appointments = [a for a in appointments if a.status == status]
-        count = len(appointments)
-
-    return AppointmentsPublic(data=appointments, count=count)
+    return page_response(
+        page_model=AppointmentsPublic,
+        item_model=AppointmentPublic,
+        rows=appointments,
+        count=count
+    )
 
 
 @router.get("/date-range", response_model=List[AppointmentPublic])
@@ -267,6 +257,7 @@ def update_appointment(
         appointment_in: AppointmentUpdate,
         current_user: CurrentUser,
         session: SessionDep,
+        background_tasks: BackgroundTasks,
 ) -> Any:
     """
     Update an appointment.
@@ -302,107 +293,100 @@ def update_appointment(
             )
 
         # Check if the appointment time is in the future
-        new_datetime = datetime.combine(new_date, new_start_time)
-        if new_datetime < datetime.now():
+        new_datetime = datetime.combine(new_date, new_start_time, tzinfo=timezone.utc)
+        if new_datetime < datetime.now(timezone.utc):
             raise HTTPException(
                 status_code=400,
                 detail="Appointment time must be in the future"
             )
 
-        # Check for conflicts with other appointments
-        day_start = new_date
-        day_end = new_date
-        existing_appointments = crud.get_appointments_by_date_range(
-            session=session,
-            nutritionist_id=appointment.nutritionist_id,
-            start_date=day_start,
-            end_date=day_end,
-            status=AppointmentStatus.SCHEDULED
+        # A scheduled appointment shrunk within its own slot cannot conflict or leave availability
+        within_current_slot = (
+            appointment.status == AppointmentStatus.SCHEDULED and
+            new_date == appointment.date and
+            new_start_time >= appointment.start_time and
+            new_end_time <= appointment.end_time
         )
+        if not within_current_slot:
+            # Hold the nutritionist's day until the appointment is committed
+            crud.lock_nutritionist_day(
+                session=session,
+                nutritionist_id=appointment.nutritionist_id,
+                date=new_date
+            )
 
-        # Check for time conflicts, excluding the current appointment
-        for existing_appt in existing_appointments:
-            if existing_appt.id != appointment.id and (
-                    (new_start_time >= existing_appt.start_time and
-                     new_start_time < existing_appt.end_time) or
-                    (new_end_time > existing_appt.start_time and
-                     new_end_time <= existing_appt.end_time) or
-                    (new_start_time <= existing_appt.start_time and
-                     new_end_time >= existing_appt.end_time)
-            ):
+            # Check for conflicts with other appointments and availability in one query
+            has_conflict, is_available = crud.check_slot_bookable(
+                session=session,
+                nutritionist_id=appointment.nutritionist_id,
+                date=new_date,
+                start_time=new_start_time,
+                end_time=new_end_time,
+                exclude_appointment_id=appointment.id
+            )
+            if has_conflict:
                 raise HTTPException(
                     status_code=400,
                     detail="The selected time slot conflicts with another appointment"
                 )
 
-        # Check if within nutritionist's availability
-        weekday = new_date.weekday()
-        availabilities = crud.get_availabilities_by_date_range(
-            session=session,
-            nutritionist_id=appointment.nutritionist_id,
-            start_date=day_start,
-            end_date=day_end
-        )
-
-        is_available = False
-        for avail in availabilities:
-            if (avail.is_recurring and avail.day_of_week == weekday) or (
-                    not avail.is_recurring and avail.specific_date == new_date
-            ):
-                if (
-                        new_start_time >= avail.start_time and
-                        new_end_time <= avail.end_time
-                ):
-                    is_available = True
-                    break
-
-        if not is_available:
-            raise HTTPException(
-                status_code=400,
-                detail="The selected time slot is not within nutritionist's availability"
-            )
+            if not is_available:
+                raise HTTPException(
+                    status_code=400,
+                    detail="The selected time slot is not within nutritionist's availability"
+                )
 
     # Update the appointment
-    updated_appointment = crud.update_appointment(
-        session=session,
-        db_appointment=appointment,
-        appointment_in=appointment_in
-    )
-
-    # Send notification emails about the update
     try:
-        # Get client and nutritionist info
-        client = crud.get_user_by_id(session=session, user_id=appointment.client_id)
-        nutritionist = crud.get_user_by_id(session=session, user_id=appointment.nutritionist_id)
+        updated_appointment = crud.update_appointment(
+            session=session,
+            db_appointment=appointment,
+            appointment_in=appointment_in
+        )
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="The selected time slot conflicts with another appointment"
+        )
 
-        # Notify both parties about the update
-        if client and nutritionist:
-            # Send to client
-            client_email_data = generate_appointment_update_email(
-                is_client=True,
-                appointment=updated_appointment,
-                nutritionist_name=nutritionist.full_name or nutritionist.email
-            )
-            send_email(
-                email_to=client.email,
-                subject=client_email_data.subject,
-                html_content=client_email_data.html_content
-            )
+    # Queue notification emails about the update, delivered after the response is sent
+    if settings.emails_enabled:
+        try:
+            # Client and nutritionist are loaded together with the appointment
+            client = appointment.client
+            nutritionist = appointment.nutritionist
+
+            # Notify both parties about the update
+            if client and nutritionist:
+                # Send to client
+                client_email_data = generate_appointment_update_email(
+                    is_client=True,
+                    appointment=updated_appointment,
+                    nutritionist_name=nutritionist.full_name or nutritionist.email
+                )
+                background_tasks.add_task(
+                    send_email,
+                    email_to=client.email,
+                    subject=client_email_data.subject,
+                    html_content=client_email_data.html_content
+                )
 
-            # Send to nutritionist
-            nutritionist_email_data = generate_appointment_update_email(
-                is_client=False,
-                appointment=updated_appointment,
-                client_name=client.full_name or client.email
-            )
-            send_email(
-                email_to=nutritionist.email,
-                subject=nutritionist_email_data.subject,
-                html_content=nutritionist_email_data.html_content
-            )
-    except Exception:
-        # If email sending fails, continue anyway
-        pass
+                # Send to nutritionist
+                nutritionist_email_data = generate_appointment_update_email(
+                    is_client=False,
+                    appointment=updated_appointment,
+                    client_name=client.full_name or client.email
+                )
+                background_tasks.add_task(
+                    send_email,
+                    email_to=nutritionist.email,
+                    subject=nutritionist_email_data.subject,
+                    html_content=nutritionist_email_data.html_content
+                )
+        except Exception:
+            # If rendering the emails fails, continue anyway
+            pass
 
     return updated_appointment
 
@@ -412,78 +396,89 @@ def cancel_appointment(
         appointment_id: uuid.UUID,
         current_user: CurrentUser,
         session: SessionDep,
+        background_tasks: BackgroundTasks,
 ) -> Any:
     """
     Cancel an appointment.
     """
-    appointment = crud.get_appointment_by_id(session=session, appointment_id=appointment_id)
+    appointment = crud.cancel_appointment(
+        session=session,
+        appointment_id=appointment_id,
+        user_id=current_user.id,
+        is_admin=current_user.user_type == UserType.ADMIN
+    )
 
     if not appointment:
-        raise HTTPException(
-            status_code=404,
-            detail="Appointment not found"
+        # Nothing was cancelled, find out why
+        existing_appointment = crud.get_appointment_by_id(
+            session=session,
+            appointment_id=appointment_id
         )
+        if not existing_appointment:
+            raise HTTPException(
+                status_code=404,
+                detail="Appointment not found"
+            )
 
-    # Check if the current user is part of this appointment
-    if (current_user.id != appointment.client_id and
-            current_user.id != appointment.nutritionist_id and
-            current_user.user_type != UserType.ADMIN):
-        raise HTTPException(
-            status_code=403,
-            detail="Not enough permissions"
-        )
+        # Check if the current user is part of this appointment
+        if (current_user.id != existing_appointment.client_id and
+                current_user.id != existing_appointment.nutritionist_id and
+                current_user.user_type != UserType.ADMIN):
+            raise HTTPException(
+                status_code=403,
+                detail="Not enough permissions"
+            )
 
-    # Check if the appointment is already cancelled
-    if appointment.status == AppointmentStatus.CANCELLED:
         raise HTTPException(
             status_code=400,
             detail="Appointment is already cancelled"
         )
 
-    # Cancel the appointment
-    cancelled_appointment = crud.cancel_appointment(
-        session=session,
-        appointment_id=appointment_id
-    )
-
-    # Send cancellation notifications
-    try:
-        # Get client and nutritionist info
-        client = crud.get_user_by_id(session=session, user_id=appointment.client_id)
-        nutritionist = crud.get_user_by_id(session=session, user_id=appointment.nutritionist_id)
-
-        # Determine who cancelled
-        canceller_is_client = current_user.id == appointment.client_id
-
-        # Notify both parties about the cancellation
-        if client and nutritionist:
-            # Send to client
-            client_email_data = generate_cancellation_email(
-                is_client=True,
-                appointment=appointment,
-                nutritionist_name=nutritionist.full_name or nutritionist.email,
-                cancelled_by_client=canceller_is_client
-            )
-            send_email(
-                email_to=client.email,
-                subject=client_email_data.subject,
-                html_content=client_email_data.html_content
+    # Queue cancellation notifications, delivered after the response is sent
+    if settings.emails_enabled:
+        try:
+            # The cancelled row comes back from UPDATE ... RETURNING without its
+            # relationships, reload it with both parties joined in
+            cancelled_appointment = crud.get_appointment_by_id(
+                session=session, appointment_id=appointment.id, reload=True
             )
+            client = cancelled_appointment.client if cancelled_appointment else None
+            nutritionist = cancelled_appointment.nutritionist if cancelled_appointment else None
+
+            # Determine who cancelled
+            canceller_is_client = current_user.id == appointment.client_id
+
+            # Notify both parties about the cancellation
+            if client and nutritionist:
+                # Send to client
+                client_email_data = generate_cancellation_email(
+                    is_client=True,
+                    appointment=appointment,
+                    nutritionist_name=nutritionist.full_name or nutritionist.email,
+                    cancelled_by_client=canceller_is_client
+                )
+                background_tasks.add_task(
+                    send_email,
+                    email_to=client.email,
+                    subject=client_email_data.subject,
+                    html_content=client_email_data.html_content
+                )
 
-            # Send to nutritionist
-            nutritionist_email_data = generate_cancellation_email(
-                is_client=False,
-                appointment=appointment,
-                client_name=client.full_name or client.email,
-                cancelled_by_client=canceller_is_client
-            )
-            send_email(
-                email_to=nutritionist.email,
-                subject=nutritionist_email_data.subject,
-                html_content=nutritionist_email_data.html_content
-            )
-    except Exception:
-        # If email sending fails, continue anyway
-        pass
+                # Send to nutritionist
+                nutritionist_email_data = generate_cancellation_email(
+                    is_client=False,
+                    appointment=appointment,
+                    client_name=client.full_name or client.email,
+                    cancelled_by_client=canceller_is_client
+                )
+                background_tasks.add_task(
+                    send_email,
+                    email_to=nutritionist.email,
+                    subject=nutritionist_email_data.subject,
+                    html_content=nutritionist_email_data.html_content
+                )
+        except Exception:
+            # If rendering the emails fails, continue anyway
+            pass
 
     return Message(message="Appointment cancelled successfully")
\ No newline at end of file
@@ -70,7 +70,7 @@ def read_availabilities(
     Get availability slots for a nutritionist.
     """
     # Check if the nutritionist exists and is a nutritionist
-    user = crud.get_user_by_id(session=session, user_id=nutritionist_id)
+    user = crud.get_user_cached(session=session, user_id=nutritionist_id)
     if not user or user.user_type != UserType.NUTRITIONIST:
         raise HTTPException(
             status_code=404,
@@ -105,7 +105,7 @@ def read_availabilities_by_date_range(
         )
 
     # Check if the nutritionist exists and is a nutritionist
-    user = crud.get_user_by_id(session=session, user_id=nutritionist_id)
+    user = crud.get_user_cached(session=session, user_id=nutritionist_id)
     if not user or user.user_type != UserType.NUTRITIONIST:
         raise HTTPException(
             status_code=404,
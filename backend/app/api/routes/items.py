@@ -6,6 +6,7 @@ from sqlmodel import func, select
 
 from app.api.deps import CurrentUser, SessionDep
 from app.models import Item, ItemCreate, ItemPublic, ItemsPublic, ItemUpdate, Message
+from app.utils import page_response
 
 router = APIRouter(prefix="/items", tags=["items"])
 
@@ -38,7 +39,9 @@ def read_items(
         )
         items = session.exec(statement).all()
 
-    return ItemsPublic(data=items, count=count)
+    return page_response(
+        page_model=ItemsPublic, item_model=ItemPublic, rows=items, count=count
+    )
 
 
 @router.get("/{id}", response_model=ItemPublic)
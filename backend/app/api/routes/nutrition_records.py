@@ -1,19 +1,64 @@
 import uuid
 from datetime import date
-from typing import Any, List
+from typing import Annotated, Any, List
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
 from app import crud
 from app.api.deps import CurrentUser, SessionDep
 from app.models import (
-    Message, NutritionRecordCreate,
+    Message, NutritionRecord, NutritionRecordCreate,
     NutritionRecordPublic, NutritionRecordUpdate,
     NutritionRecordsPublic, UserType
 )
+from app.utils import page_response
 
 router = APIRouter(tags=["nutrition-records"])
 
+BULK_CREATE_MAX_RECORDS = 1000
+
+
+def get_readable_record(
+        record_id: uuid.UUID,
+        session: SessionDep,
+        current_user: CurrentUser,
+) -> NutritionRecord:
+    """Load a nutrition record the current user is allowed to view."""
+    record = crud.get_nutrition_record_by_id(session=session, record_id=record_id)
+
+    if not record:
+        raise HTTPException(
+            status_code=404,
+            detail="Nutrition record not found"
+        )
+
+    # Only nutritionists, admins, or the client themselves can view records
+    if current_user.user_type == UserType.CLIENT and current_user.id != record.client_id:
+        raise HTTPException(
+            status_code=403,
+            detail="Not enough permissions"
+        )
+
+    return record
+
+
+ReadableRecord = Annotated[NutritionRecord, Depends(get_readable_record)]
+
+
+def get_editable_record(record: ReadableRecord, current_user: CurrentUser) -> NutritionRecord:
+    """Load a nutrition record the current user is allowed to update or delete."""
+    # Only the creator or an admin can change records
+    if current_user.id != record.created_by_id and current_user.user_type != UserType.ADMIN:
+        raise HTTPException(
+            status_code=403,
+            detail="Not enough permissions"
+        )
+
+    return record
+
+
+EditableRecord = Annotated[NutritionRecord, Depends(get_editable_record)]
+
 
 @router.post("/", response_model=NutritionRecordPublic)
 def create_nutrition_record(
@@ -33,7 +78,7 @@ def create_nutrition_record(
         )
 
     # Check if the client exists
-    client = crud.get_user_by_id(session=session, user_id=record_in.client_id)
+    client = crud.get_user_cached(session=session, user_id=record_in.client_id)
     if not client:
         raise HTTPException(
             status_code=404,
@@ -50,6 +95,46 @@ def create_nutrition_record(
     return record
 
 
+@router.post("/bulk", response_model=list[NutritionRecordPublic])
+def create_nutrition_records_bulk(
+        records_in: list[NutritionRecordCreate],
+        current_user: CurrentUser,
+        session: SessionDep,
+) -> Any:
+    """
+    Create several nutrition records in one request.
+    """
+    if len(records_in) > BULK_CREATE_MAX_RECORDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BULK_CREATE_MAX_RECORDS} records can be created at once"
+        )
+
+    client_ids = {record_in.client_id for record_in in records_in}
+
+    # Same rules as a single create: clients can only create records for themselves
+    if current_user.user_type == UserType.CLIENT and client_ids - {current_user.id}:
+        raise HTTPException(
+            status_code=403,
+            detail="Not enough permissions"
+        )
+
+    # Check that every client exists
+    if client_ids and crud.get_existing_user_ids(session=session, user_ids=client_ids) != client_ids:
+        raise HTTPException(
+            status_code=404,
+            detail="Client not found"
+        )
+
+    records = crud.bulk_create_nutrition_records(
+        session=session,
+        records_in=records_in,
+        created_by_id=current_user.id
+    )
+
+    return records
+
+
 @router.get("/me", response_model=NutritionRecordsPublic)
 def read_my_nutrition_records(
         session: SessionDep,
@@ -67,20 +152,20 @@ def read_my_nutrition_records(
             detail="This endpoint is only for clients"
         )
 
-    records = crud.get_nutrition_records_by_client(
+    records, count = crud.get_nutrition_records_page(
         session=session,
         client_id=current_user.id,
         skip=skip,
         limit=limit
     )
 
-    count = crud.get_nutrition_records_count_by_client(
-        session=session,
-        client_id=current_user.id
+    return page_response(
+        page_model=NutritionRecordsPublic,
+        item_model=NutritionRecordPublic,
+        rows=records,
+        count=count
     )
 
-    return NutritionRecordsPublic(data=records, count=count)
-
 
 @router.get("/{client_id}", response_model=NutritionRecordsPublic)
 def read_client_nutrition_records(
@@ -100,27 +185,26 @@ def read_client_nutrition_records(
             detail="Not enough permissions"
         )
 
-    # Check if the client exists
-    client = crud.get_user_by_id(session=session, user_id=client_id)
-    if not client:
-        raise HTTPException(
-            status_code=404,
-            detail="Client not found"
-        )
-
-    records = crud.get_nutrition_records_by_client(
+    records, count = crud.get_nutrition_records_page(
         session=session,
         client_id=client_id,
         skip=skip,
         limit=limit
     )
 
-    count = crud.get_nutrition_records_count_by_client(
-        session=session,
-        client_id=client_id
-    )
+    # Only a client without records may not exist at all
+    if not count and not crud.get_user_cached(session=session, user_id=client_id):
+        raise HTTPException(
+            status_code=404,
+            detail="Client not found"
+        )
 
-    return NutritionRecordsPublic(data=records, count=count)
+    return page_response(
+        page_model=NutritionRecordsPublic,
+        item_model=NutritionRecordPublic,
+        rows=records,
+        count=count
+    )
 
 
 @router.get("/date-range/{client_id}", response_model=List[NutritionRecordPublic])
@@ -148,14 +232,6 @@ def read_nutrition_records_by_date_range(
             detail="Not enough permissions"
         )
 
-    # Check if the client exists
-    client = crud.get_user_by_id(session=session, user_id=client_id)
-    if not client:
-        raise HTTPException(
-            status_code=404,
-            detail="Client not found"
-        )
-
     records = crud.get_nutrition_records_by_date_range(
         session=session,
         client_id=client_id,
@@ -163,62 +239,33 @@ def read_nutrition_records_by_date_range(
         end_date=end_date
     )
 
+    # Only a client without records in the range may not exist at all
+    if not records and not crud.get_user_cached(session=session, user_id=client_id):
+        raise HTTPException(
+            status_code=404,
+            detail="Client not found"
+        )
+
     return records
 
 
 @router.get("/record/{record_id}", response_model=NutritionRecordPublic)
-def read_nutrition_record(
-        record_id: uuid.UUID,
-        session: SessionDep,
-        current_user: CurrentUser,
-) -> Any:
+def read_nutrition_record(record: ReadableRecord) -> Any:
     """
     Get a specific nutrition record.
     """
-    record = crud.get_nutrition_record_by_id(session=session, record_id=record_id)
-
-    if not record:
-        raise HTTPException(
-            status_code=404,
-            detail="Nutrition record not found"
-        )
-
-    # Check permissions - only nutritionists, admins, or the client themselves can view records
-    if (current_user.user_type == UserType.CLIENT and
-            current_user.id != record.client_id):
-        raise HTTPException(
-            status_code=403,
-            detail="Not enough permissions"
-        )
-
     return record
 
 
 @router.patch("/record/{record_id}", response_model=NutritionRecordPublic)
 def update_nutrition_record(
-        record_id: uuid.UUID,
+        record: EditableRecord,
         record_in: NutritionRecordUpdate,
         session: SessionDep,
-        current_user: CurrentUser,
 ) -> Any:
     """
     Update a nutrition record.
     """
-    record = crud.get_nutrition_record_by_id(session=session, record_id=record_id)
-
-    if not record:
-        raise HTTPException(
-            status_code=404,
-            detail="Nutrition record not found"
-        )
-
-    # Check permissions - only the creator or an admin can update records
-    if current_user.id != record.created_by_id and current_user.user_type != UserType.ADMIN:
-        raise HTTPException(
-            status_code=403,
-            detail="Not enough permissions"
-        )
-
     updated_record = crud.update_nutrition_record(
         session=session,
         db_record=record,
@@ -230,28 +277,12 @@ def update_nutrition_record(
 
 @router.delete("/record/{record_id}", response_model=Message)
 def delete_nutrition_record(
-        record_id: uuid.UUID,
+        record: EditableRecord,
         session: SessionDep,
-        current_user: CurrentUser,
 ) -> Any:
     """
     Delete a nutrition record.
     """
-    record = crud.get_nutrition_record_by_id(session=session, record_id=record_id)
-
-    if not record:
-        raise HTTPException(
-            status_code=404,
-            detail="Nutrition record not found"
-        )
-
-    # Check permissions - only the creator or an admin can delete records
-    if current_user.id != record.created_by_id and current_user.user_type != UserType.ADMIN:
-        raise HTTPException(
-            status_code=403,
-            detail="Not enough permissions"
-        )
-
-    crud.delete_nutrition_record(session=session, record_id=record_id)
+    crud.delete_nutrition_record(session=session, record_id=record.id)
 
-    return Message(message="Nutrition record deleted successfully")
\ No newline at end of file
+    return Message(message="Nutrition record deleted successfully")
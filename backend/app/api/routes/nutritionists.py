@@ -1,16 +1,20 @@
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 
 from app import crud
 from app.api.deps import SessionDep
-from app.models import UserPublic, UserType, UsersPublic
+from app.models import UserListRow, UserPublic, UserType, UsersListPublic
+from app.utils import page_response
 
 router = APIRouter(tags=["nutritionists"])
 
+# The public nutritionist directory changes rarely, let browsers and proxies reuse it
+CACHE_CONTROL = "public, max-age=300"
 
-@router.get("/", response_model=UsersPublic)
+
+@router.get("/", response_model=UsersListPublic)
 def read_nutritionists(
         session: SessionDep,
         skip: int = 0,
@@ -19,23 +23,27 @@ def read_nutritionists(
     """
     Retrieve all nutritionists.
     """
-    nutritionists = crud.get_users(
+    nutritionists, count = crud.get_user_rows_page(
         session=session,
         skip=skip,
         limit=limit,
         user_type=UserType.NUTRITIONIST
     )
-    count = crud.get_users_count(
-        session=session,
-        user_type=UserType.NUTRITIONIST
+    page = page_response(
+        page_model=UsersListPublic,
+        item_model=UserListRow,
+        rows=nutritionists,
+        count=count
     )
-    return UsersPublic(data=nutritionists, count=count)
+    page.headers["Cache-Control"] = CACHE_CONTROL
+    return page
 
 
 @router.get("/{nutritionist_id}", response_model=UserPublic)
 def read_nutritionist(
         nutritionist_id: uuid.UUID,
         session: SessionDep,
+        response: Response,
 ) -> Any:
     """
     Get a specific nutritionist by ID.
@@ -48,4 +56,5 @@ def read_nutritionist(
             detail="Nutritionist not found"
         )
 
+    response.headers["Cache-Control"] = CACHE_CONTROL
     return user
\ No newline at end of file
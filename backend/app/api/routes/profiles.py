@@ -2,6 +2,7 @@ import uuid
 from typing import Any
 
 from fastapi import APIRouter, HTTPException
+from sqlalchemy.exc import IntegrityError
 
 from app import crud
 from app.api.deps import CurrentUser, SessionDep
@@ -38,9 +39,17 @@ def create_profile_me(
             detail="Profile already exists for this user",
         )
 
-    profile = crud.create_profile(
-        session=session, profile_in=profile_in, user_id=current_user.id
-    )
+    try:
+        profile = crud.create_profile(
+            session=session, profile_in=profile_in, user_id=current_user.id
+        )
+    except IntegrityError:
+        # A concurrent request created the profile first
+        session.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Profile already exists for this user",
+        )
     return profile
 
 
@@ -37,6 +37,10 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
     FRONTEND_HOST: str = "http://localhost:5173"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
+    # Sync path operations and dependencies run in this many worker threads
+    THREADPOOL_MAX_WORKERS: int = 100
+    # bcrypt work factor, each increment doubles the hashing time
+    BCRYPT_ROUNDS: int = 12
 
     BACKEND_CORS_ORIGINS: Annotated[
         list[AnyUrl] | str, BeforeValidator(parse_cors)
@@ -56,6 +60,13 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = ""
+    # Connection pool per worker process, sized for the threadpool above
+    POSTGRES_POOL_SIZE: int = 20
+    POSTGRES_MAX_OVERFLOW: int = 40
+    POSTGRES_POOL_TIMEOUT: int = 30
+    POSTGRES_POOL_RECYCLE: int = 3600
+    # Set when POSTGRES_SERVER is PgBouncer in transaction pooling mode
+    POSTGRES_PGBOUNCER: bool = False
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -1,10 +1,33 @@
+from typing import Any
+
+from sqlalchemy.pool import NullPool
 from sqlmodel import Session, create_engine, select
 
 from app import crud
 from app.core.config import settings
 from app.models import User, UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+
+def _engine_options() -> dict[str, Any]:
+    if settings.POSTGRES_PGBOUNCER:
+        # PgBouncer does the pooling; server-side prepared statements don't
+        # survive its connection switching between transactions
+        return {"poolclass": NullPool, "connect_args": {"prepare_threshold": None}}
+    return {
+        "pool_size": settings.POSTGRES_POOL_SIZE,
+        "max_overflow": settings.POSTGRES_MAX_OVERFLOW,
+        "pool_timeout": settings.POSTGRES_POOL_TIMEOUT,
+        # Drop connections the server or a firewall closed while they sat idle
+        "pool_pre_ping": True,
+        "pool_recycle": settings.POSTGRES_POOL_RECYCLE,
+    }
+
+
+# Compiled SQL is cached per statement shape, size the cache for all the crud queries
+# (psycopg also prepares a statement server-side after it has run a few times)
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI), query_cache_size=1200, **_engine_options()
+)
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -1,9 +1,13 @@
+import threading
+import time as time_module
 import uuid
-from datetime import date, datetime, timezone
-from typing import Any, List, Optional
+from dataclasses import dataclass
+from datetime import date, time, timedelta
+from typing import Any, List, Optional, Tuple, cast
 
-from sqlalchemy import and_
-from sqlmodel import Session, select, or_
+from sqlalchemy import and_, bindparam, exists, insert, not_, update
+from sqlalchemy.orm import QueryableAttribute, joinedload, raiseload
+from sqlmodel import Session, col, func, select, or_
 
 from app.core.security import get_password_hash, verify_password
 from app.models import (
@@ -16,6 +20,46 @@ from app.models import (
 )
 
 
+def _get_page(
+        *,
+        session: Session,
+        model: Any,
+        filters: List[Any],
+        skip: int,
+        limit: int,
+        order_by: Tuple[Any, ...] = (),
+        columns: Tuple[Any, ...] = (),
+        options: Tuple[Any, ...] = ()
+) -> Tuple[List[Any], int]:
+    """
+    Get a page of rows together with the total match count in one query.
+
+    With columns, only those are selected and the page holds rows with them as
+    attributes instead of model instances. Loader options apply to the model
+    instances.
+    """
+    entities: Tuple[Any, ...] = (
+        *(columns or (model,)), func.count().over().label("total_count")
+    )
+    statement = select(*entities).where(*filters).order_by(*order_by).offset(skip).limit(limit)
+    if options:
+        statement = statement.options(*options)
+    rows = session.exec(statement).all()
+    if rows:
+        page = list(rows) if columns else [row[0] for row in rows]
+        return page, rows[0].total_count
+    if skip == 0:
+        return [], 0
+    # Past the last page there is no row to carry the window count
+    count_statement = select(func.count()).select_from(model).where(*filters)
+    return [], session.exec(count_statement).one()
+
+
+def _dirty_dict(model: Any) -> dict[str, Any]:
+    """The fields explicitly set on an update payload, like model_dump(exclude_unset=True) for flat models."""
+    return {field: getattr(model, field) for field in model.model_fields_set}
+
+
 def create_user(*, session: Session, user_create: UserCreate) -> User:
     db_obj = User.model_validate(
         user_create, update={"hashed_password": get_password_hash(user_create.password)}
@@ -27,7 +71,7 @@ def create_user(*, session: Session, user_create: UserCreate) -> User:
 
 
 def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
-    user_data = user_in.model_dump(exclude_unset=True)
+    user_data = _dirty_dict(user_in)
     extra_data = {}
     if "password" in user_data:
         password = user_data["password"]
@@ -37,19 +81,94 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
     session.add(db_user)
     session.commit()
     session.refresh(db_user)
+    invalidate_cached_user(db_user.id)
     return db_user
 
 
+# Hot lookups built once at import, each call only binds its parameter
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+_PROFILE_BY_USER_ID = select(Profile).where(Profile.user_id == bindparam("user_id"))
+
+
 def get_user_by_email(*, session: Session, email: str) -> User | None:
-    statement = select(User).where(User.email == email)
-    session_user = session.exec(statement).first()
+    session_user = session.exec(_USER_BY_EMAIL, params={"email": email}).first()
     return session_user
 
 
 def get_user_by_id(*, session: Session, user_id: uuid.UUID) -> Optional[User]:
-    statement = select(User).where(User.id == user_id)
-    session_user = session.exec(statement).first()
-    return session_user
+    return session.get(User, user_id)
+
+
+def get_existing_user_ids(*, session: Session, user_ids: set[uuid.UUID]) -> set[uuid.UUID]:
+    """Get which of the given user ids exist, in a single query."""
+    statement = select(User.id).where(col(User.id).in_(user_ids))
+    return set(session.exec(statement).all())
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """The subset of a user needed for role checks and notification emails."""
+    id: uuid.UUID
+    email: str
+    full_name: str | None
+    user_type: UserType
+
+
+USER_CACHE_TTL_SECONDS = 300
+USER_CACHE_MAX_SIZE = 10_000
+
+_user_cache: dict[uuid.UUID, tuple[float, CachedUser]] = {}
+# Sync routes run in a threadpool, guard every access to the cache
+_user_cache_lock = threading.Lock()
+
+
+def get_user_cached(*, session: Session, user_id: uuid.UUID) -> Optional[CachedUser]:
+    """
+    Get a read-only summary of a user, served from an in-process TTL cache.
+
+    Only use it for read-only checks, entries can be up to USER_CACHE_TTL_SECONDS stale
+    in other worker processes. Anything a write depends on must read the row instead,
+    see get_user_for_share. Missing users are not cached.
+    """
+    now = time_module.monotonic()
+    with _user_cache_lock:
+        entry = _user_cache.get(user_id)
+    if entry and entry[0] > now:
+        return entry[1]
+
+    db_user = session.get(User, user_id)
+    if not db_user:
+        invalidate_cached_user(user_id)
+        return None
+
+    cached_user = CachedUser(
+        id=db_user.id,
+        email=db_user.email,
+        full_name=db_user.full_name,
+        user_type=db_user.user_type,
+    )
+    with _user_cache_lock:
+        if len(_user_cache) >= USER_CACHE_MAX_SIZE:
+            # Evict the oldest insertion
+            _user_cache.pop(next(iter(_user_cache)), None)
+        _user_cache[user_id] = (now + USER_CACHE_TTL_SECONDS, cached_user)
+    return cached_user
+
+
+def invalidate_cached_user(user_id: uuid.UUID) -> None:
+    """Drop a user from this process's cache after it was updated or deleted."""
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
+
+def get_user_for_share(*, session: Session, user_id: uuid.UUID) -> Optional[User]:
+    """
+    Get a user and hold a FOR SHARE lock on the row until the transaction ends.
+
+    The user can't be updated or deleted until then, so checks made on it stay true
+    for whatever the transaction writes next.
+    """
+    return session.get(User, user_id, with_for_update={"read": True})
 
 
 def authenticate(*, session: Session, email: str, password: str) -> User | None:
@@ -61,21 +180,21 @@ def authenticate(*, session: Session, email: str, password: str) -> User | None:
     return db_user
 
 
-def get_users(
+def get_user_rows_page(
         *, session: Session, skip: int = 0, limit: int = 100, user_type: Optional[UserType] = None
-) -> List[User]:
-    statement = select(User)
+) -> Tuple[List[Any], int]:
+    """Get a page of users, optionally filtered by type, with only the UserListRow columns."""
+    filters = []
     if user_type:
-        statement = statement.where(User.user_type == user_type)
-    statement = statement.offset(skip).limit(limit)
-    return session.exec(statement).all()
-
-
-def get_users_count(*, session: Session, user_type: Optional[UserType] = None) -> int:
-    statement = select(User)
-    if user_type:
-        statement = statement.where(User.user_type == user_type)
-    return len(session.exec(statement).all())
+        filters.append(User.user_type == user_type)
+    return _get_page(
+        session=session,
+        model=User,
+        filters=filters,
+        skip=skip,
+        limit=limit,
+        columns=(User.id, User.email, User.full_name, User.user_type)
+    )
 
 
 def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -> Item:
@@ -90,35 +209,26 @@ def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -
 
 def create_profile(*, session: Session, profile_in: ProfileCreate, user_id: uuid.UUID) -> Profile:
     """Create a new profile for a user."""
-    now = datetime.now(timezone.utc).date()
     db_profile = Profile.model_validate(
-        profile_in, update={
-            "user_id": user_id,
-            "created_at": now,
-            "updated_at": now
-        }
+        profile_in, update={"user_id": user_id}
     )
     session.add(db_profile)
-    session.commit()
-    session.refresh(db_profile)
+    session.flush()
     return db_profile
 
 
 def update_profile(*, session: Session, db_profile: Profile, profile_in: ProfileUpdate) -> Profile:
     """Update a user's profile."""
-    profile_data = profile_in.model_dump(exclude_unset=True)
-    profile_data["updated_at"] = datetime.now(timezone.utc).date()
+    profile_data = _dirty_dict(profile_in)
     db_profile.sqlmodel_update(profile_data)
     session.add(db_profile)
-    session.commit()
-    session.refresh(db_profile)
+    session.flush()
     return db_profile
 
 
 def get_profile_by_user_id(*, session: Session, user_id: uuid.UUID) -> Optional[Profile]:
     """Get a user's profile by user ID."""
-    statement = select(Profile).where(Profile.user_id == user_id)
-    return session.exec(statement).first()
+    return session.exec(_PROFILE_BY_USER_ID, params={"user_id": user_id}).first()
 
 
 def get_profile_by_id(*, session: Session, profile_id: uuid.UUID) -> Optional[Profile]:
@@ -132,17 +242,11 @@ def create_availability(
         *, session: Session, availability_in: AvailabilityCreate, nutritionist_id: uuid.UUID
 ) -> Availability:
     """Create a new availability slot for a nutritionist."""
-    now = datetime.now(timezone.utc).date()
     db_availability = Availability.model_validate(
-        availability_in, update={
-            "nutritionist_id": nutritionist_id,
-            "created_at": now,
-            "updated_at": now
-        }
+        availability_in, update={"nutritionist_id": nutritionist_id}
     )
     session.add(db_availability)
-    session.commit()
-    session.refresh(db_availability)
+    session.flush()
     return db_availability
 
 
@@ -150,12 +254,10 @@ def update_availability(
         *, session: Session, db_availability: Availability, availability_in: AvailabilityUpdate
 ) -> Availability:
     """Update an availability slot."""
-    availability_data = availability_in.model_dump(exclude_unset=True)
-    availability_data["updated_at"] = datetime.now(timezone.utc).date()
+    availability_data = _dirty_dict(availability_in)
     db_availability.sqlmodel_update(availability_data)
     session.add(db_availability)
-    session.commit()
-    session.refresh(db_availability)
+    session.flush()
     return db_availability
 
 
@@ -176,19 +278,27 @@ def get_availabilities_by_nutritionist(
 
 def get_availabilities_count_by_nutritionist(*, session: Session, nutritionist_id: uuid.UUID) -> int:
     """Get count of availability slots for a nutritionist."""
-    statement = select(Availability).where(Availability.nutritionist_id == nutritionist_id)
-    return len(session.exec(statement).all())
+    statement = select(func.count()).select_from(Availability).where(
+        Availability.nutritionist_id == nutritionist_id
+    )
+    return session.exec(statement).one()
 
 
 def get_availabilities_by_date_range(
         *, session: Session, nutritionist_id: uuid.UUID, start_date: date, end_date: date
 ) -> List[Availability]:
     """Get availability slots for a nutritionist within a date range."""
+    # Weekdays the range touches, a week or more covers all of them
+    days_in_range = min((end_date - start_date).days + 1, 7)
+    weekdays = sorted({(start_date + timedelta(days=i)).weekday() for i in range(days_in_range)})
     statement = select(Availability).where(
         Availability.nutritionist_id == nutritionist_id,
         or_(
-            # For recurring slots (need to check day of week)
-            Availability.is_recurring == True,
+            # For recurring slots on a weekday within the range
+            and_(
+                Availability.is_recurring == True,
+                col(Availability.day_of_week).in_(weekdays)
+            ),
             # For specific date slots
             and_(
                 Availability.is_recurring == False,
@@ -205,26 +315,26 @@ def delete_availability(*, session: Session, availability_id: uuid.UUID) -> None
     availability = session.get(Availability, availability_id)
     if availability:
         session.delete(availability)
-        session.commit()
+        session.flush()
 
 
 # Appointment
 
+# AppointmentPublic carries only the party ids, so list queries never need the
+# client or nutritionist rows. Raise instead of lazy loading one SELECT per row
+# if a serializer starts reaching for them.
+_APPOINTMENT_LIST_OPTIONS = (raiseload("*"),)
+
+
 def create_appointment(
         *, session: Session, appointment_in: AppointmentCreate, client_id: uuid.UUID
 ) -> Appointment:
     """Create a new appointment."""
-    now = datetime.now(timezone.utc).date()
     db_appointment = Appointment.model_validate(
-        appointment_in, update={
-            "client_id": client_id,
-            "created_at": now,
-            "updated_at": now
-        }
+        appointment_in, update={"client_id": client_id}
     )
     session.add(db_appointment)
-    session.commit()
-    session.refresh(db_appointment)
+    session.flush()
     return db_appointment
 
 
@@ -232,50 +342,78 @@ def update_appointment(
         *, session: Session, db_appointment: Appointment, appointment_in: AppointmentUpdate
 ) -> Appointment:
     """Update an appointment."""
-    appointment_data = appointment_in.model_dump(exclude_unset=True)
-    appointment_data["updated_at"] = datetime.now(timezone.utc).date()
+    appointment_data = _dirty_dict(appointment_in)
     db_appointment.sqlmodel_update(appointment_data)
     session.add(db_appointment)
-    session.commit()
-    session.refresh(db_appointment)
+    session.flush()
     return db_appointment
 
 
-def get_appointment_by_id(*, session: Session, appointment_id: uuid.UUID) -> Optional[Appointment]:
-    """Get an appointment by ID."""
-    return session.get(Appointment, appointment_id)
+def get_appointment_by_id(
+        *, session: Session, appointment_id: uuid.UUID, reload: bool = False
+) -> Optional[Appointment]:
+    """
+    Get an appointment by ID, with its client and nutritionist joined in.
+
+    With reload, the row is selected again even if the session already holds it,
+    so the participants are joined in for instances loaded without them.
+    """
+    return session.get(
+        Appointment,
+        appointment_id,
+        options=[
+            # SQLModel types relationship attributes as the related model
+            joinedload(cast(QueryableAttribute[Any], Appointment.client)),
+            joinedload(cast(QueryableAttribute[Any], Appointment.nutritionist)),
+        ],
+        populate_existing=reload
+    )
 
 
 def get_appointments_by_client(
-        *, session: Session, client_id: uuid.UUID, skip: int = 0, limit: int = 100
-) -> List[Appointment]:
-    """Get all appointments for a client."""
-    statement = select(Appointment).where(
-        Appointment.client_id == client_id
-    ).offset(skip).limit(limit).order_by(Appointment.date, Appointment.start_time)
-    return session.exec(statement).all()
-
-
-def get_appointments_count_by_client(*, session: Session, client_id: uuid.UUID) -> int:
-    """Get count of appointments for a client."""
-    statement = select(Appointment).where(Appointment.client_id == client_id)
-    return len(session.exec(statement).all())
+        *,
+        session: Session,
+        client_id: uuid.UUID,
+        skip: int = 0,
+        limit: int = 100,
+        status: Optional[AppointmentStatus] = None
+) -> Tuple[List[Appointment], int]:
+    """Get appointments for a client, optionally filtered by status, and their total count."""
+    filters = [Appointment.client_id == client_id]
+    if status:
+        filters.append(Appointment.status == status)
+    return _get_page(
+        session=session,
+        model=Appointment,
+        filters=filters,
+        skip=skip,
+        limit=limit,
+        order_by=(Appointment.date, Appointment.start_time),
+        options=_APPOINTMENT_LIST_OPTIONS
+    )
 
 
 def get_appointments_by_nutritionist(
-        *, session: Session, nutritionist_id: uuid.UUID, skip: int = 0, limit: int = 100
-) -> List[Appointment]:
-    """Get all appointments for a nutritionist."""
-    statement = select(Appointment).where(
-        Appointment.nutritionist_id == nutritionist_id
-    ).offset(skip).limit(limit).order_by(Appointment.date, Appointment.start_time)
-    return session.exec(statement).all()
-
-
-def get_appointments_count_by_nutritionist(*, session: Session, nutritionist_id: uuid.UUID) -> int:
-    """Get count of appointments for a nutritionist."""
-    statement = select(Appointment).where(Appointment.nutritionist_id == nutritionist_id)
-    return len(session.exec(statement).all())
+        *,
+        session: Session,
+        nutritionist_id: uuid.UUID,
+        skip: int = 0,
+        limit: int = 100,
+        status: Optional[AppointmentStatus] = None
+) -> Tuple[List[Appointment], int]:
+    """Get appointments for a nutritionist, optionally filtered by status, and their total count."""
+    filters = [Appointment.nutritionist_id == nutritionist_id]
+    if status:
+        filters.append(Appointment.status == status)
+    return _get_page(
+        session=session,
+        model=Appointment,
+        filters=filters,
+        skip=skip,
+        limit=limit,
+        order_by=(Appointment.date, Appointment.start_time),
+        options=_APPOINTMENT_LIST_OPTIONS
+    )
 
 
 def get_appointments_by_date_range(
@@ -304,19 +442,93 @@ def get_appointments_by_date_range(
     if status:
         statement = statement.where(Appointment.status == status)
 
-    statement = statement.order_by(Appointment.date, Appointment.start_time)
+    statement = statement.order_by(Appointment.date, Appointment.start_time).options(
+        *_APPOINTMENT_LIST_OPTIONS
+    )
     return session.exec(statement).all()
 
 
-def cancel_appointment(*, session: Session, appointment_id: uuid.UUID) -> Optional[Appointment]:
-    """Cancel an appointment by setting its status to cancelled."""
-    appointment = session.get(Appointment, appointment_id)
-    if appointment:
-        appointment.status = AppointmentStatus.CANCELLED
-        appointment.updated_at = datetime.now(timezone.utc).date()
-        session.add(appointment)
-        session.commit()
-        session.refresh(appointment)
+def lock_nutritionist_day(*, session: Session, nutritionist_id: uuid.UUID, date: date) -> None:
+    """
+    Serialize bookings for a nutritionist's day.
+
+    Takes a transaction-scoped advisory lock, released on the next commit or rollback,
+    so concurrent check-then-insert sequences for the same day run one at a time.
+    """
+    key = f"{nutritionist_id}:{date.isoformat()}"
+    session.exec(select(func.pg_advisory_xact_lock(func.hashtext(key)))).one()
+
+
+def check_slot_bookable(
+        *,
+        session: Session,
+        nutritionist_id: uuid.UUID,
+        date: date,
+        start_time: time,
+        end_time: time,
+        exclude_appointment_id: Optional[uuid.UUID] = None
+) -> Tuple[bool, bool]:
+    """
+    Check a time slot for a nutritionist in a single round-trip.
+
+    Returns a `(has_conflict, is_available)` tuple: whether a scheduled appointment
+    overlaps the slot and whether an availability slot fully covers it.
+    """
+    conflict = select(Appointment.id).where(
+        Appointment.nutritionist_id == nutritionist_id,
+        Appointment.date == date,
+        Appointment.status == AppointmentStatus.SCHEDULED,
+        Appointment.start_time < end_time,
+        Appointment.end_time > start_time
+    )
+    if exclude_appointment_id:
+        conflict = conflict.where(Appointment.id != exclude_appointment_id)
+
+    covering_availability = select(Availability.id).where(
+        Availability.nutritionist_id == nutritionist_id,
+        or_(
+            and_(
+                col(Availability.is_recurring),
+                col(Availability.day_of_week) == date.weekday()
+            ),
+            and_(
+                not_(col(Availability.is_recurring)),
+                col(Availability.specific_date) == date
+            )
+        ),
+        Availability.start_time <= start_time,
+        Availability.end_time >= end_time
+    )
+
+    statement = select(exists(conflict), exists(covering_availability))
+    has_conflict, is_available = session.exec(statement).one()
+    return has_conflict, is_available
+
+
+def cancel_appointment(
+        *, session: Session, appointment_id: uuid.UUID, user_id: uuid.UUID, is_admin: bool = False
+) -> Optional[Appointment]:
+    """
+    Cancel an appointment in a single conditional UPDATE.
+
+    Only appointments that are not cancelled yet and that `user_id` takes part in
+    (or any, for admins) are updated. Returns None when nothing matched.
+    """
+    filters = [
+        col(Appointment.id) == appointment_id,
+        col(Appointment.status) != AppointmentStatus.CANCELLED,
+    ]
+    if not is_admin:
+        filters.append(
+            or_(
+                col(Appointment.client_id) == user_id,
+                col(Appointment.nutritionist_id) == user_id
+            )
+        )
+    statement = update(Appointment).where(*filters).values(
+        status=AppointmentStatus.CANCELLED
+    ).returning(Appointment)
+    appointment: Optional[Appointment] = session.execute(statement).scalar_one_or_none()
     return appointment
 
 
@@ -329,30 +541,41 @@ def create_nutrition_record(
         created_by_id: uuid.UUID
 ) -> NutritionRecord:
     """Create a new nutrition record."""
-    now = datetime.now(timezone.utc).date()
     db_record = NutritionRecord.model_validate(
-        record_in, update={
-            "created_by_id": created_by_id,
-            "created_at": now,
-            "updated_at": now
-        }
+        record_in, update={"created_by_id": created_by_id}
     )
     session.add(db_record)
-    session.commit()
-    session.refresh(db_record)
+    session.flush()
     return db_record
 
 
+def bulk_create_nutrition_records(
+        *,
+        session: Session,
+        records_in: List[NutritionRecordCreate],
+        created_by_id: uuid.UUID
+) -> List[NutritionRecord]:
+    """Create several nutrition records with a single multi-row INSERT ... RETURNING."""
+    if not records_in:
+        return []
+    # ids come from the column's gen_random_uuid() default
+    rows = [
+        {**record_in.model_dump(), "created_by_id": created_by_id}
+        for record_in in records_in
+    ]
+    # Rows come back in the order of records_in
+    statement = insert(NutritionRecord).returning(NutritionRecord, sort_by_parameter_order=True)
+    return list(session.scalars(statement, rows).all())
+
+
 def update_nutrition_record(
         *, session: Session, db_record: NutritionRecord, record_in: NutritionRecordUpdate
 ) -> NutritionRecord:
     """Update a nutrition record."""
-    record_data = record_in.model_dump(exclude_unset=True)
-    record_data["updated_at"] = datetime.now(timezone.utc).date()
+    record_data = _dirty_dict(record_in)
     db_record.sqlmodel_update(record_data)
     session.add(db_record)
-    session.commit()
-    session.refresh(db_record)
+    session.flush()
     return db_record
 
 
@@ -361,20 +584,18 @@ def get_nutrition_record_by_id(*, session: Session, record_id: uuid.UUID) -> Opt
     return session.get(NutritionRecord, record_id)
 
 
-def get_nutrition_records_by_client(
+def get_nutrition_records_page(
         *, session: Session, client_id: uuid.UUID, skip: int = 0, limit: int = 100
-) -> List[NutritionRecord]:
-    """Get all nutrition records for a client."""
-    statement = select(NutritionRecord).where(
-        NutritionRecord.client_id == client_id
-    ).offset(skip).limit(limit).order_by(NutritionRecord.date.desc())
-    return session.exec(statement).all()
-
-
-def get_nutrition_records_count_by_client(*, session: Session, client_id: uuid.UUID) -> int:
-    """Get count of nutrition records for a client."""
-    statement = select(NutritionRecord).where(NutritionRecord.client_id == client_id)
-    return len(session.exec(statement).all())
+) -> Tuple[List[NutritionRecord], int]:
+    """Get a page of nutrition records for a client, newest first, and their total count."""
+    return _get_page(
+        session=session,
+        model=NutritionRecord,
+        filters=[NutritionRecord.client_id == client_id],
+        skip=skip,
+        limit=limit,
+        order_by=(NutritionRecord.date.desc(),)
+    )
 
 
 def get_nutrition_records_by_date_range(
@@ -394,4 +615,4 @@ def delete_nutrition_record(*, session: Session, record_id: uuid.UUID) -> None:
     record = session.get(NutritionRecord, record_id)
     if record:
         session.delete(record)
-        session.commit()
+        session.flush()
@@ -1,12 +1,52 @@
 import uuid
-from datetime import date, time
+from datetime import date, datetime, time
 from enum import Enum
-from typing import List, Optional
-
-from pydantic import EmailStr
+from functools import lru_cache
+from typing import Annotated, Any, List, Optional
+
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic.networks import validate_email
+from pydantic_core import core_schema
+from sqlalchemy import (
+    Column,
+    Computed,
+    DateTime,
+    FetchedValue,
+    Float,
+    Index,
+    func,
+    text,
+)
 from sqlmodel import Field, Relationship, SQLModel
 
 
+@lru_cache(maxsize=4096)
+def _normalize_email(value: str) -> str:
+    # Same check and normalization as pydantic's EmailStr, repeated addresses are cached
+    return validate_email(value)[1]
+
+
+class _CachedEmail:
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        return core_schema.no_info_after_validator_function(
+            _normalize_email, handler(str)
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(
+        cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler
+    ) -> dict[str, Any]:
+        field_schema = handler(schema)
+        field_schema.update(type="string", format="email")
+        return field_schema
+
+
+EmailStr = Annotated[str, _CachedEmail]
+
+
 # Enums for constrained fields
 class UserType(str, Enum):
     CLIENT = "client"
@@ -60,33 +100,51 @@ class UpdatePassword(SQLModel):
 
 # Database model, database table inferred from class name
 class User(UserBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    id: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        primary_key=True,
+        sa_column_kwargs={"server_default": text("gen_random_uuid()")},
+    )
     hashed_password: str
-    items: list["Item"] = Relationship(back_populates="owner", cascade_delete=True)
-    profile: Optional["Profile"] = Relationship(back_populates="user", sa_relationship_kwargs={"uselist": False})
+    # Dependent rows are removed by the ON DELETE CASCADE foreign keys, passive_deletes
+    # keeps the ORM from loading them first
+    items: list["Item"] = Relationship(
+        back_populates="owner", cascade_delete=True, passive_deletes=True
+    )
+    profile: Optional["Profile"] = Relationship(
+        back_populates="user",
+        sa_relationship_kwargs={"uselist": False},
+        cascade_delete=True,
+        passive_deletes=True
+    )
     appointments_as_client: List["Appointment"] = Relationship(
         back_populates="client",
         sa_relationship_kwargs={"foreign_keys": "Appointment.client_id"},
-        cascade_delete=True
+        cascade_delete=True,
+        passive_deletes=True
     )
     appointments_as_nutritionist: List["Appointment"] = Relationship(
         back_populates="nutritionist",
         sa_relationship_kwargs={"foreign_keys": "Appointment.nutritionist_id"},
-        cascade_delete=True
+        cascade_delete=True,
+        passive_deletes=True
     )
     availabilities: List["Availability"] = Relationship(
         back_populates="nutritionist",
-        cascade_delete=True
+        cascade_delete=True,
+        passive_deletes=True
     )
     nutrition_records: List["NutritionRecord"] = Relationship(
         back_populates="client",
         sa_relationship_kwargs={"foreign_keys": "NutritionRecord.client_id"},
-        cascade_delete=True
+        cascade_delete=True,
+        passive_deletes=True
     )
     created_records: List["NutritionRecord"] = Relationship(
         back_populates="created_by",
         sa_relationship_kwargs={"foreign_keys": "NutritionRecord.created_by_id"},
-        cascade_delete=True
+        cascade_delete=True,
+        passive_deletes=True
     )
 
 
@@ -100,6 +158,19 @@ class UsersPublic(SQLModel):
     count: int
 
 
+# Properties to return in directory listings, without the account flags
+class UserListRow(SQLModel):
+    id: uuid.UUID
+    email: EmailStr
+    full_name: str | None = None
+    user_type: UserType
+
+
+class UsersListPublic(SQLModel):
+    data: list[UserListRow]
+    count: int
+
+
 # Profile models
 class ProfileBase(SQLModel):
     phone: Optional[str] = Field(default=None, max_length=20)
@@ -120,11 +191,30 @@ class ProfileUpdate(ProfileBase):
 
 
 class Profile(ProfileBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    user_id: uuid.UUID = Field(foreign_key="user.id")
+    __table_args__ = (
+        # One profile per user, also serves the profile-by-user lookup
+        Index("ix_profile_user", "user_id", unique=True),
+    )
+
+    id: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        primary_key=True,
+        sa_column_kwargs={"server_default": text("gen_random_uuid()")},
+    )
+    user_id: uuid.UUID = Field(foreign_key="user.id", ondelete="CASCADE")
     user: User = Relationship(back_populates="profile")
-    created_at: Optional[date] = Field(default=None)
-    updated_at: Optional[date] = Field(default=None)
+    created_at: Optional[datetime] = Field(
+        default=None,
+        nullable=False,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"server_default": func.now()},
+    )
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        nullable=False,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"server_default": func.now(), "server_onupdate": FetchedValue()},
+    )
 
 
 class ProfilePublic(ProfileBase):
@@ -150,11 +240,36 @@ class AvailabilityUpdate(AvailabilityBase):
 
 
 class Availability(AvailabilityBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    nutritionist_id: uuid.UUID = Field(foreign_key="user.id")
+    __table_args__ = (
+        Index(
+            "ix_avail_nutri_dow", "nutritionist_id", "day_of_week",
+            postgresql_where=text("is_recurring")
+        ),
+        Index(
+            "ix_avail_nutri_specific", "nutritionist_id", "specific_date",
+            postgresql_where=text("NOT is_recurring")
+        ),
+    )
+
+    id: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        primary_key=True,
+        sa_column_kwargs={"server_default": text("gen_random_uuid()")},
+    )
+    nutritionist_id: uuid.UUID = Field(foreign_key="user.id", ondelete="CASCADE")
     nutritionist: User = Relationship(back_populates="availabilities")
-    created_at: Optional[date] = Field(default=None)
-    updated_at: Optional[date] = Field(default=None)
+    created_at: Optional[datetime] = Field(
+        default=None,
+        nullable=False,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"server_default": func.now()},
+    )
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        nullable=False,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"server_default": func.now(), "server_onupdate": FetchedValue()},
+    )
 
 
 class AvailabilityPublic(AvailabilityBase):
@@ -184,9 +299,22 @@ class AppointmentUpdate(SQLModel):
 
 
 class Appointment(AppointmentBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    client_id: uuid.UUID = Field(foreign_key="user.id")
-    nutritionist_id: uuid.UUID = Field(foreign_key="user.id")
+    __table_args__ = (
+        Index(
+            "ix_appt_nutri_date_status", "nutritionist_id", "date", "status",
+            postgresql_where=text("status = 'SCHEDULED'")
+        ),
+        Index("ix_appointment_nutr_date_time", "nutritionist_id", "date", "start_time"),
+        Index("ix_appointment_client_date_time", "client_id", "date", "start_time"),
+    )
+
+    id: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        primary_key=True,
+        sa_column_kwargs={"server_default": text("gen_random_uuid()")},
+    )
+    client_id: uuid.UUID = Field(foreign_key="user.id", ondelete="CASCADE")
+    nutritionist_id: uuid.UUID = Field(foreign_key="user.id", ondelete="CASCADE")
     client: User = Relationship(
         back_populates="appointments_as_client",
         sa_relationship_kwargs={"foreign_keys": "Appointment.client_id"}
@@ -195,8 +323,18 @@ class Appointment(AppointmentBase, table=True):
         back_populates="appointments_as_nutritionist",
         sa_relationship_kwargs={"foreign_keys": "Appointment.nutritionist_id"}
     )
-    created_at: Optional[date] = Field(default=None)
-    updated_at: Optional[date] = Field(default=None)
+    created_at: Optional[datetime] = Field(
+        default=None,
+        nullable=False,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"server_default": func.now()},
+    )
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        nullable=False,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"server_default": func.now(), "server_onupdate": FetchedValue()},
+    )
 
 
 class AppointmentPublic(AppointmentBase):
@@ -232,9 +370,17 @@ class NutritionRecordUpdate(SQLModel):
 
 
 class NutritionRecord(NutritionRecordBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    client_id: uuid.UUID = Field(foreign_key="user.id")
-    created_by_id: uuid.UUID = Field(foreign_key="user.id")
+    __table_args__ = (
+        Index("ix_nutritionrecord_client_date", "client_id", text("date DESC")),
+    )
+
+    id: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        primary_key=True,
+        sa_column_kwargs={"server_default": text("gen_random_uuid()")},
+    )
+    client_id: uuid.UUID = Field(foreign_key="user.id", ondelete="CASCADE")
+    created_by_id: uuid.UUID = Field(foreign_key="user.id", ondelete="CASCADE")
     client: User = Relationship(
         back_populates="nutrition_records",
         sa_relationship_kwargs={"foreign_keys": "NutritionRecord.client_id"}
@@ -243,16 +389,29 @@ class NutritionRecord(NutritionRecordBase, table=True):
         back_populates="created_records",
         sa_relationship_kwargs={"foreign_keys": "NutritionRecord.created_by_id"}
     )
-    created_at: Optional[date] = Field(default=None)
-    updated_at: Optional[date] = Field(default=None)
-
-    @property
-    def bmi(self) -> Optional[float]:
-        """Calculate BMI if height and weight are provided."""
-        if self.height and self.weight and self.height > 0:
-            # Height in meters, weight in kg
-            return self.weight / (self.height ** 2)
-        return None
+    created_at: Optional[datetime] = Field(
+        default=None,
+        nullable=False,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"server_default": func.now()},
+    )
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        nullable=False,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"server_default": func.now(), "server_onupdate": FetchedValue()},
+    )
+    # Height in meters, weight in kg, computed by the database when the row is written
+    bmi: Optional[float] = Field(
+        default=None,
+        sa_column=Column(
+            Float,
+            Computed(
+                "CASE WHEN height > 0 AND weight <> 0 THEN weight / (height * height) END",
+                persisted=True,
+            ),
+        ),
+    )
 
 
 class NutritionRecordPublic(NutritionRecordBase):
@@ -285,7 +444,11 @@ class ItemUpdate(ItemBase):
 
 # Database model, database table inferred from class name
 class Item(ItemBase, table=True):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    id: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        primary_key=True,
+        sa_column_kwargs={"server_default": text("gen_random_uuid()")},
+    )
     owner_id: uuid.UUID = Field(
         foreign_key="user.id", nullable=False, ondelete="CASCADE"
     )
@@ -1,15 +1,17 @@
 import uuid
+from collections.abc import Generator
 from datetime import date, time, timedelta
 from unittest.mock import patch
 
+import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import Session, select
+from sqlmodel import Session
 
 from app import crud
 from app.core.config import settings
 from app.models import (
     User, UserCreate, UserType,
-    Appointment, AppointmentCreate, AppointmentStatus,
+    Appointment, AppointmentStatus,
     Availability, AvailabilityCreate
 )
 from app.tests.utils.utils import random_lower_string, random_email
@@ -45,33 +47,75 @@ def create_test_availability(db: Session, nutritionist_id: uuid.UUID) -> Availab
         availability_in=availability_in,
         nutritionist_id=nutritionist_id
     )
+    db.commit()
 
     return availability
 
 
 def create_test_appointment(
-        db: Session, client_id: uuid.UUID, nutritionist_id: uuid.UUID
+        db: Session,
+        client_id: uuid.UUID,
+        nutritionist_id: uuid.UUID,
+        status: AppointmentStatus = AppointmentStatus.SCHEDULED
 ) -> Appointment:
-    """Create a test appointment for tomorrow"""
+    """Create a test appointment for tomorrow, bypassing the booking checks"""
     tomorrow = date.today() + timedelta(days=1)
 
-    appointment_in = AppointmentCreate(
+    # The test controls every input, build the row directly instead of validating an AppointmentCreate
+    appointment = Appointment(
+        client_id=client_id,
         nutritionist_id=nutritionist_id,
         date=tomorrow,
         start_time=time(10, 0),
         end_time=time(11, 0),
+        status=status,
         notes="Test appointment"
     )
-
-    appointment = crud.create_appointment(
-        session=db,
-        appointment_in=appointment_in,
-        client_id=client_id
-    )
+    db.add(appointment)
+    db.commit()
 
     return appointment
 
 
+def create_test_appointments(db: Session, appointments: list[Appointment]) -> list[Appointment]:
+    """Insert several fixture appointments in one flush, bypassing the booking checks"""
+    db.add_all(appointments)
+    db.commit()
+    return appointments
+
+
+def make_appointment_payload(nutritionist_id: uuid.UUID, **overrides: str) -> dict[str, str]:
+    """Build a booking request for tomorrow from 10:00 to 11:00, with any fields overridden"""
+    return {
+        "nutritionist_id": str(nutritionist_id),
+        "date": (date.today() + timedelta(days=1)).isoformat(),
+        "start_time": "10:00:00",
+        "end_time": "11:00:00",
+        "notes": "Test appointment",
+        **overrides
+    }
+
+
+@pytest.fixture(scope="module", autouse=True)
+def no_emails() -> Generator[None, None, None]:
+    """Never send real emails from the appointment routes"""
+    # The routes import send_email by name, patch it where it is looked up
+    with patch("app.api.routes.appointments.send_email", return_value=None):
+        yield
+
+
+@pytest.fixture(scope="module")
+def available_nutritionist(db: Session) -> User:
+    """
+    A nutritionist available tomorrow, shared by the tests that never book a slot.
+
+    Tests that book must create their own, a booking would conflict with the others.
+    """
+    nutritionist = create_test_nutritionist(db)
+    create_test_availability(db, nutritionist.id)
+    return nutritionist
+
+
 def test_create_appointment(
         client: TestClient, normal_user_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -80,25 +124,18 @@ def test_create_appointment(
     nutritionist = create_test_nutritionist(db)
 
     # Create availability for the nutritionist
-    availability = create_test_availability(db, nutritionist.id)
+    create_test_availability(db, nutritionist.id)
 
     # Appointment data
     tomorrow = date.today() + timedelta(days=1)
-    appointment_data = {
-        "nutritionist_id": str(nutritionist.id),
-        "date": tomorrow.isoformat(),
-        "start_time": "10:00:00",
-        "end_time": "11:00:00",
-        "notes": "Test appointment"
-    }
+    appointment_data = make_appointment_payload(nutritionist.id)
 
     # Create the appointment
-    with patch("app.utils.send_email", return_value=None):
-        response = client.post(
-            f"{settings.API_V1_STR}/appointments/",
-            headers=normal_user_token_headers,
-            json=appointment_data
-        )
+    response = client.post(
+        f"{settings.API_V1_STR}/appointments/",
+        headers=normal_user_token_headers,
+        json=appointment_data
+    )
 
     # Check response
     assert response.status_code == 200
@@ -123,14 +160,7 @@ def test_create_appointment_invalid_nutritionist(
 ) -> None:
     """Test creating an appointment with an invalid nutritionist"""
     # Appointment data with a non-existent nutritionist
-    tomorrow = date.today() + timedelta(days=1)
-    appointment_data = {
-        "nutritionist_id": str(uuid.uuid4()),
-        "date": tomorrow.isoformat(),
-        "start_time": "10:00:00",
-        "end_time": "11:00:00",
-        "notes": "Test appointment"
-    }
+    appointment_data = make_appointment_payload(uuid.uuid4())
 
     # Create the appointment
     response = client.post(
@@ -145,58 +175,56 @@ def test_create_appointment_invalid_nutritionist(
     assert data["detail"] == "Nutritionist not found"
 
 
-def test_create_appointment_invalid_time_range(
+def test_create_appointment_demoted_nutritionist(
         client: TestClient, normal_user_token_headers: dict[str, str], db: Session
 ) -> None:
-    """Test creating an appointment with an invalid time range"""
-    # Create a nutritionist
+    """Test that booking reads the nutritionist's current role, not a cached one"""
+    # Create a nutritionist with availability and warm the user cache
     nutritionist = create_test_nutritionist(db)
+    create_test_availability(db, nutritionist.id)
+    crud.get_user_cached(session=db, user_id=nutritionist.id)
 
-    # Create availability for the nutritionist
-    availability = create_test_availability(db, nutritionist.id)
-
-    # Appointment data with end time before start time
-    tomorrow = date.today() + timedelta(days=1)
-    appointment_data = {
-        "nutritionist_id": str(nutritionist.id),
-        "date": tomorrow.isoformat(),
-        "start_time": "11:00:00",
-        "end_time": "10:00:00",
-        "notes": "Test appointment"
-    }
+    # Demote the nutritionist without invalidating the cache, as another worker would
+    nutritionist.user_type = UserType.CLIENT
+    db.add(nutritionist)
+    db.commit()
 
     # Create the appointment
     response = client.post(
         f"{settings.API_V1_STR}/appointments/",
         headers=normal_user_token_headers,
-        json=appointment_data
+        json=make_appointment_payload(nutritionist.id)
     )
 
     # Check response
-    assert response.status_code == 400
+    assert response.status_code == 404
     data = response.json()
-    assert data["detail"] == "End time must be after start time"
+    assert data["detail"] == "Nutritionist not found"
 
 
-def test_create_appointment_past_date(
-        client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+@pytest.mark.parametrize(
+    "overrides,detail",
+    [
+        # End time before start time
+        ({"start_time": "11:00:00", "end_time": "10:00:00"}, "End time must be after start time"),
+        # Past date
+        (
+            {"date": (date.today() - timedelta(days=1)).isoformat()},
+            "Appointment time must be in the future"
+        ),
+    ],
+    ids=["invalid_time_range", "past_date"]
+)
+def test_create_appointment_invalid(
+        client: TestClient,
+        normal_user_token_headers: dict[str, str],
+        available_nutritionist: User,
+        overrides: dict[str, str],
+        detail: str,
 ) -> None:
-    """Test creating an appointment in the past"""
-    # Create a nutritionist
-    nutritionist = create_test_nutritionist(db)
-
-    # Create availability for the nutritionist
-    availability = create_test_availability(db, nutritionist.id)
-
-    # Appointment data with past date
-    yesterday = date.today() - timedelta(days=1)
-    appointment_data = {
-        "nutritionist_id": str(nutritionist.id),
-        "date": yesterday.isoformat(),
-        "start_time": "10:00:00",
-        "end_time": "11:00:00",
-        "notes": "Test appointment"
-    }
+    """Test creating an appointment that fails validation"""
+    # Appointment data for tomorrow, with the invalid fields overridden
+    appointment_data = make_appointment_payload(available_nutritionist.id, **overrides)
 
     # Create the appointment
     response = client.post(
@@ -208,38 +236,31 @@ def test_create_appointment_past_date(
     # Check response
     assert response.status_code == 400
     data = response.json()
-    assert data["detail"] == "Appointment time must be in the future"
+    assert data["detail"] == detail
 
 
 def test_create_appointment_time_conflict(
-        client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+        client: TestClient,
+        normal_user_token_headers: dict[str, str],
+        normal_user_id: uuid.UUID,
+        db: Session
 ) -> None:
     """Test creating an appointment with a time conflict"""
     # Create a nutritionist
     nutritionist = create_test_nutritionist(db)
 
     # Create availability for the nutritionist
-    availability = create_test_availability(db, nutritionist.id)
+    create_test_availability(db, nutritionist.id)
 
     # Create a first appointment
-    tomorrow = date.today() + timedelta(days=1)
-    statement = select(User).where(User.email == settings.EMAIL_TEST_USER)
-    current_user = db.exec(statement).first()
-
-    first_appointment = create_test_appointment(
+    create_test_appointment(
         db=db,
-        client_id=current_user.id,
+        client_id=normal_user_id,
         nutritionist_id=nutritionist.id
     )
 
     # Try to create a second appointment at the same time
-    appointment_data = {
-        "nutritionist_id": str(nutritionist.id),
-        "date": tomorrow.isoformat(),
-        "start_time": "10:00:00",
-        "end_time": "11:00:00",
-        "notes": "Test appointment"
-    }
+    appointment_data = make_appointment_payload(nutritionist.id)
 
     # Create the second appointment
     response = client.post(
@@ -254,23 +275,61 @@ def test_create_appointment_time_conflict(
     assert data["detail"] == "The selected time slot is already booked"
 
 
+def test_create_appointment_adjacent_slot(
+        client: TestClient,
+        normal_user_token_headers: dict[str, str],
+        normal_user_id: uuid.UUID,
+        db: Session
+) -> None:
+    """Test that an appointment starting when another one ends is not a conflict"""
+    # Create a nutritionist
+    nutritionist = create_test_nutritionist(db)
+
+    # Create availability for the nutritionist
+    create_test_availability(db, nutritionist.id)
+
+    # Create a first appointment from 10:00 to 11:00
+    create_test_appointment(
+        db=db,
+        client_id=normal_user_id,
+        nutritionist_id=nutritionist.id
+    )
+
+    # Book the slot right after it
+    appointment_data = make_appointment_payload(
+        nutritionist.id, start_time="11:00:00", end_time="12:00:00"
+    )
+
+    response = client.post(
+        f"{settings.API_V1_STR}/appointments/",
+        headers=normal_user_token_headers,
+        json=appointment_data
+    )
+
+    # Check response
+    assert response.status_code == 200
+    data = response.json()
+    assert data["start_time"] == "11:00:00"
+    assert data["end_time"] == "12:00:00"
+
+
 def test_get_appointments(
-        client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+        client: TestClient,
+        normal_user_token_headers: dict[str, str],
+        normal_user_id: uuid.UUID,
+        db: Session
 ) -> None:
     """Test getting all appointments for the current user"""
     # Create a nutritionist
     nutritionist = create_test_nutritionist(db)
 
     # Create availability for the nutritionist
-    availability = create_test_availability(db, nutritionist.id)
+    create_test_availability(db, nutritionist.id)
 
     # Create an appointment
-    statement = select(User).where(User.email == settings.EMAIL_TEST_USER)
-    current_user = db.exec(statement).first()
-
     appointment = create_test_appointment(
         db=db,
-        client_id=current_user.id,
+        client_id=normal_user_id,
         nutritionist_id=nutritionist.id
     )
 
@@ -289,43 +348,41 @@ def test_get_appointments(
     assert data["count"] >= 1
 
     # Check that the appointment we created is in the response
-    appointment_in_response = False
-    for appt in data["data"]:
-        if appt["id"] == str(appointment.id):
-            appointment_in_response = True
-            break
-    assert appointment_in_response
+    assert str(appointment.id) in {appt["id"] for appt in data["data"]}
 
 
 def test_get_appointments_with_status_filter(
-        client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+        client: TestClient,
+        normal_user_token_headers: dict[str, str],
+        normal_user_id: uuid.UUID,
+        db: Session
 ) -> None:
     """Test getting appointments filtered by status"""
-    # Create a nutritionist
+    # Create a nutritionist, inserted appointments don't need availability
     nutritionist = create_test_nutritionist(db)
 
-    # Create availability for the nutritionist
-    availability = create_test_availability(db, nutritionist.id)
-
-    # Create a scheduled appointment
-    statement = select(User).where(User.email == settings.EMAIL_TEST_USER)
-    current_user = db.exec(statement).first()
-
-    scheduled_appointment = create_test_appointment(
-        db=db,
-        client_id=current_user.id,
-        nutritionist_id=nutritionist.id
-    )
-
-    # Create a cancelled appointment
-    cancelled_appointment = create_test_appointment(
-        db=db,
-        client_id=current_user.id,
-        nutritionist_id=nutritionist.id
-    )
-    cancelled_appointment.status = AppointmentStatus.CANCELLED
-    db.add(cancelled_appointment)
-    db.commit()
+    # Create a scheduled appointment and a cancelled one in the same slot,
+    # the cancelled one must not count as an overlap
+    tomorrow = date.today() + timedelta(days=1)
+    create_test_appointments(db, [
+        Appointment(
+            client_id=normal_user_id,
+            nutritionist_id=nutritionist.id,
+            date=tomorrow,
+            start_time=time(10, 0),
+            end_time=time(11, 0),
+            notes="Test appointment"
+        ),
+        Appointment(
+            client_id=normal_user_id,
+            nutritionist_id=nutritionist.id,
+            date=tomorrow,
+            start_time=time(10, 0),
+            end_time=time(11, 0),
+            status=AppointmentStatus.CANCELLED,
+            notes="Test appointment"
+        ),
+    ])
 
     # Get only scheduled appointments
     response = client.get(
@@ -340,8 +397,7 @@ def test_get_appointments_with_status_filter(
     assert len(data["data"]) >= 1
 
     # Check that all appointments have the scheduled status
-    for appt in data["data"]:
-        assert appt["status"] == AppointmentStatus.SCHEDULED
+    assert {appt["status"] for appt in data["data"]} == {AppointmentStatus.SCHEDULED}
 
     # Get only cancelled appointments
     response = client.get(
@@ -356,62 +412,40 @@ def test_get_appointments_with_status_filter(
     assert len(data["data"]) >= 1
 
     # Check that all appointments have the cancelled status
-    for appt in data["data"]:
-        assert appt["status"] == AppointmentStatus.CANCELLED
+    assert {appt["status"] for appt in data["data"]} == {AppointmentStatus.CANCELLED}
 
 
 def test_get_appointments_by_date_range(
-        client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+        client: TestClient,
+        normal_user_token_headers: dict[str, str],
+        normal_user_id: uuid.UUID,
+        db: Session
 ) -> None:
     """Test getting appointments within a date range"""
-    # Create a nutritionist
+    # Create a nutritionist, inserted appointments don't need availability
     nutritionist = create_test_nutritionist(db)
 
-    # Create availability for the nutritionist
-    availability = create_test_availability(db, nutritionist.id)
-
-    # Create an appointment for tomorrow
-    statement = select(User).where(User.email == settings.EMAIL_TEST_USER)
-    current_user = db.exec(statement).first()
-
+    # Create an appointment for tomorrow and one for the day after
     tomorrow = date.today() + timedelta(days=1)
-    appointment_tomorrow = create_test_appointment(
-        db=db,
-        client_id=current_user.id,
-        nutritionist_id=nutritionist.id
-    )
-
-    # Create an appointment for day after tomorrow
     day_after_tomorrow = date.today() + timedelta(days=2)
-
-    # For this appointment, we need to create a new availability first
-    weekday = day_after_tomorrow.weekday()
-    availability_in = AvailabilityCreate(
-        day_of_week=weekday,
-        start_time=time(9, 0),
-        end_time=time(17, 0),
-        is_recurring=True
-    )
-
-    another_availability = crud.create_availability(
-        session=db,
-        availability_in=availability_in,
-        nutritionist_id=nutritionist.id
-    )
-
-    appointment_in = AppointmentCreate(
-        nutritionist_id=nutritionist.id,
-        date=day_after_tomorrow,
-        start_time=time(10, 0),
-        end_time=time(11, 0),
-        notes="Test appointment for day after tomorrow"
-    )
-
-    appointment_day_after = crud.create_appointment(
-        session=db,
-        appointment_in=appointment_in,
-        client_id=current_user.id
-    )
+    create_test_appointments(db, [
+        Appointment(
+            client_id=normal_user_id,
+            nutritionist_id=nutritionist.id,
+            date=tomorrow,
+            start_time=time(10, 0),
+            end_time=time(11, 0),
+            notes="Test appointment"
+        ),
+        Appointment(
+            client_id=normal_user_id,
+            nutritionist_id=nutritionist.id,
+            date=day_after_tomorrow,
+            start_time=time(10, 0),
+            end_time=time(11, 0),
+            notes="Test appointment for day after tomorrow"
+        ),
+    ])
 
     # Get appointments for tomorrow only
     start_date = tomorrow.isoformat()
@@ -427,8 +461,7 @@ def test_get_appointments_by_date_range(
     assert len(data) >= 1
 
     # Check that all appointments are on tomorrow's date
-    for appt in data:
-        assert appt["date"] == tomorrow.isoformat()
+    assert {appt["date"] for appt in data} == {tomorrow.isoformat()}
 
     # Get appointments for tomorrow and day after tomorrow
     start_date = tomorrow.isoformat()
@@ -444,28 +477,26 @@ def test_get_appointments_by_date_range(
     assert len(data) >= 2
 
     # Check that all appointments are within the date range
-    for appt in data:
-        appt_date = date.fromisoformat(appt["date"])
-        assert appt_date >= tomorrow and appt_date <= day_after_tomorrow
+    assert {appt["date"] for appt in data} <= {tomorrow.isoformat(), day_after_tomorrow.isoformat()}
 
 
 def test_get_specific_appointment(
-        client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+        client: TestClient,
+        normal_user_token_headers: dict[str, str],
+        normal_user_id: uuid.UUID,
+        db: Session
 ) -> None:
     """Test getting a specific appointment"""
     # Create a nutritionist
     nutritionist = create_test_nutritionist(db)
 
     # Create availability for the nutritionist
-    availability = create_test_availability(db, nutritionist.id)
+    create_test_availability(db, nutritionist.id)
 
     # Create an appointment
-    statement = select(User).where(User.email == settings.EMAIL_TEST_USER)
-    current_user = db.exec(statement).first()
-
     appointment = create_test_appointment(
         db=db,
-        client_id=current_user.id,
+        client_id=normal_user_id,
         nutritionist_id=nutritionist.id
     )
 
@@ -507,22 +538,22 @@ def test_get_specific_appointment_not_found(
 
 
 def test_update_appointment(
-        client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+        client: TestClient,
+        normal_user_token_headers: dict[str, str],
+        normal_user_id: uuid.UUID,
+        db: Session
 ) -> None:
     """Test updating an appointment"""
     # Create a nutritionist
     nutritionist = create_test_nutritionist(db)
 
     # Create availability for the nutritionist
-    availability = create_test_availability(db, nutritionist.id)
+    create_test_availability(db, nutritionist.id)
 
     # Create an appointment
-    statement = select(User).where(User.email == settings.EMAIL_TEST_USER)
-    current_user = db.exec(statement).first()
-
     appointment = create_test_appointment(
         db=db,
-        client_id=current_user.id,
+        client_id=normal_user_id,
         nutritionist_id=nutritionist.id
     )
 
@@ -534,12 +565,11 @@ def test_update_appointment(
     }
 
     # Update the appointment
-    with patch("app.utils.send_email", return_value=None):
-        response = client.patch(
-            f"{settings.API_V1_STR}/appointments/{appointment.id}",
-            headers=normal_user_token_headers,
-            json=update_data
-        )
+    response = client.patch(
+        f"{settings.API_V1_STR}/appointments/{appointment.id}",
+        headers=normal_user_token_headers,
+        json=update_data
+    )
 
     # Check response
     assert response.status_code == 200
@@ -550,31 +580,29 @@ def test_update_appointment(
     assert data["end_time"] == "11:30:00"
 
     # Check database
-    db.expire_all()
-    updated_appointment = db.get(Appointment, appointment.id)
-    assert updated_appointment is not None
-    assert updated_appointment.notes == "Updated test appointment"
-    assert updated_appointment.start_time == time(10, 30)
-    assert updated_appointment.end_time == time(11, 30)
+    db.refresh(appointment)
+    assert appointment.notes == "Updated test appointment"
+    assert appointment.start_time == time(10, 30)
+    assert appointment.end_time == time(11, 30)
 
 
 def test_update_appointment_invalid_time_range(
-        client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+        client: TestClient,
+        normal_user_token_headers: dict[str, str],
+        normal_user_id: uuid.UUID,
+        db: Session
 ) -> None:
     """Test updating an appointment with an invalid time range"""
     # Create a nutritionist
     nutritionist = create_test_nutritionist(db)
 
     # Create availability for the nutritionist
-    availability = create_test_availability(db, nutritionist.id)
+    create_test_availability(db, nutritionist.id)
 
     # Create an appointment
-    statement = select(User).where(User.email == settings.EMAIL_TEST_USER)
-    current_user = db.exec(statement).first()
-
     appointment = create_test_appointment(
         db=db,
-        client_id=current_user.id,
+        client_id=normal_user_id,
         nutritionist_id=nutritionist.id
     )
 
@@ -598,31 +626,30 @@ def test_update_appointment_invalid_time_range(
 
 
 def test_cancel_appointment(
-        client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+        client: TestClient,
+        normal_user_token_headers: dict[str, str],
+        normal_user_id: uuid.UUID,
+        db: Session
 ) -> None:
     """Test cancelling an appointment"""
     # Create a nutritionist
     nutritionist = create_test_nutritionist(db)
 
     # Create availability for the nutritionist
-    availability = create_test_availability(db, nutritionist.id)
+    create_test_availability(db, nutritionist.id)
 
     # Create an appointment
-    statement = select(User).where(User.email == settings.EMAIL_TEST_USER)
-    current_user = db.exec(statement).first()
-
     appointment = create_test_appointment(
         db=db,
-        client_id=current_user.id,
+        client_id=normal_user_id,
         nutritionist_id=nutritionist.id
     )
 
     # Cancel the appointment
-    with patch("app.utils.send_email", return_value=None):
-        response = client.delete(
-            f"{settings.API_V1_STR}/appointments/{appointment.id}",
-            headers=normal_user_token_headers
-        )
+    response = client.delete(
+        f"{settings.API_V1_STR}/appointments/{appointment.id}",
+        headers=normal_user_token_headers
+    )
 
     # Check response
     assert response.status_code == 200
@@ -630,37 +657,31 @@ def test_cancel_appointment(
     assert data["message"] == "Appointment cancelled successfully"
 
     # Check database
-    db.expire_all()
-    cancelled_appointment = db.get(Appointment, appointment.id)
-    assert cancelled_appointment is not None
-    assert cancelled_appointment.status == AppointmentStatus.CANCELLED
+    db.refresh(appointment)
+    assert appointment.status == AppointmentStatus.CANCELLED
 
 
 def test_cancel_already_cancelled_appointment(
-        client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+        client: TestClient,
+        normal_user_token_headers: dict[str, str],
+        normal_user_id: uuid.UUID,
+        db: Session
 ) -> None:
     """Test cancelling an already cancelled appointment"""
     # Create a nutritionist
     nutritionist = create_test_nutritionist(db)
 
     # Create availability for the nutritionist
-    availability = create_test_availability(db, nutritionist.id)
-
-    # Create an appointment
-    statement = select(User).where(User.email == settings.EMAIL_TEST_USER)
-    current_user = db.exec(statement).first()
+    create_test_availability(db, nutritionist.id)
 
+    # Create an appointment that is already cancelled
     appointment = create_test_appointment(
         db=db,
-        client_id=current_user.id,
-        nutritionist_id=nutritionist.id
+        client_id=normal_user_id,
+        nutritionist_id=nutritionist.id,
+        status=AppointmentStatus.CANCELLED
     )
 
-    # Cancel the appointment first
-    appointment.status = AppointmentStatus.CANCELLED
-    db.add(appointment)
-    db.commit()
-
     # Try to cancel it again
     response = client.delete(
         f"{settings.API_V1_STR}/appointments/{appointment.id}",
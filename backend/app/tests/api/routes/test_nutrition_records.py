@@ -0,0 +1,129 @@
+import uuid
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud
+from app.api.routes.nutrition_records import BULK_CREATE_MAX_RECORDS
+from app.core.config import settings
+from app.models import NutritionRecord, UserCreate, UserType
+from app.tests.utils.user import create_random_user, user_authentication_headers
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+@pytest.fixture(scope="module")
+def nutritionist_token_headers(client: TestClient, db: Session) -> dict[str, str]:
+    email = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=email, password=password, user_type=UserType.NUTRITIONIST)
+    crud.create_user(session=db, user_create=user_in)
+    return user_authentication_headers(client=client, email=email, password=password)
+
+
+def test_create_nutrition_records_bulk(
+    client: TestClient, nutritionist_token_headers: dict[str, str], db: Session
+) -> None:
+    first_client = create_random_user(db)
+    second_client = create_random_user(db)
+    data = [
+        {
+            "client_id": str(first_client.id),
+            "date": date.today().isoformat(),
+            "weight": 80.0,
+            "height": 2.0,
+        },
+        {
+            "client_id": str(second_client.id),
+            "date": date.today().isoformat(),
+            "weight": 70.0,
+        },
+    ]
+    response = client.post(
+        f"{settings.API_V1_STR}/nutrition-records/bulk",
+        headers=nutritionist_token_headers,
+        json=data,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert len(content) == 2
+    assert [record["client_id"] for record in content] == [
+        str(first_client.id),
+        str(second_client.id),
+    ]
+    assert content[0]["bmi"] == pytest.approx(20.0)
+    assert content[1]["bmi"] is None
+
+    for record in content:
+        db_record = db.get(NutritionRecord, uuid.UUID(record["id"]))
+        assert db_record
+        assert str(db_record.client_id) == record["client_id"]
+
+
+def test_create_nutrition_records_bulk_empty(
+    client: TestClient, nutritionist_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/nutrition-records/bulk",
+        headers=nutritionist_token_headers,
+        json=[],
+    )
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_create_nutrition_records_bulk_too_many(
+    client: TestClient, nutritionist_token_headers: dict[str, str]
+) -> None:
+    record = {"client_id": str(uuid.uuid4()), "date": date.today().isoformat()}
+    response = client.post(
+        f"{settings.API_V1_STR}/nutrition-records/bulk",
+        headers=nutritionist_token_headers,
+        json=[record] * (BULK_CREATE_MAX_RECORDS + 1),
+    )
+    assert response.status_code == 400
+    content = response.json()
+    assert (
+        content["detail"]
+        == f"At most {BULK_CREATE_MAX_RECORDS} records can be created at once"
+    )
+
+
+def test_create_nutrition_records_bulk_for_other_client(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    normal_user_id: uuid.UUID,
+    db: Session,
+) -> None:
+    other_client = create_random_user(db)
+    data = [
+        {"client_id": str(normal_user_id), "date": date.today().isoformat()},
+        {"client_id": str(other_client.id), "date": date.today().isoformat()},
+    ]
+    response = client.post(
+        f"{settings.API_V1_STR}/nutrition-records/bulk",
+        headers=normal_user_token_headers,
+        json=data,
+    )
+    assert response.status_code == 403
+    content = response.json()
+    assert content["detail"] == "Not enough permissions"
+
+
+def test_create_nutrition_records_bulk_unknown_client(
+    client: TestClient, nutritionist_token_headers: dict[str, str], db: Session
+) -> None:
+    known_client = create_random_user(db)
+    data = [
+        {"client_id": str(known_client.id), "date": date.today().isoformat()},
+        {"client_id": str(uuid.uuid4()), "date": date.today().isoformat()},
+    ]
+    response = client.post(
+        f"{settings.API_V1_STR}/nutrition-records/bulk",
+        headers=nutritionist_token_headers,
+        json=data,
+    )
+    assert response.status_code == 404
+    content = response.json()
+    assert content["detail"] == "Client not found"
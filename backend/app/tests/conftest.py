@@ -1,19 +1,74 @@
+import os
+import uuid
 from collections.abc import Generator
+from pathlib import Path
 
 import pytest
+from alembic import command
+from alembic.config import Config
 from fastapi.testclient import TestClient
-from sqlmodel import Session, delete
+from sqlalchemy import make_url, text
+from sqlmodel import Session, create_engine, delete, select
 
 from app.core.config import settings
-from app.core.db import engine, init_db
-from app.main import app
-from app.models import Item, User, Appointment, NutritionRecord, Availability, Profile
-from app.tests.utils.user import authentication_token_from_email
-from app.tests.utils.utils import get_superuser_token_headers
+
+# PgBouncer only routes to the main database, so tests can be pointed at the
+# Postgres server itself, which also serves the xdist worker databases below
+if os.environ.get("TEST_POSTGRES_SERVER"):
+    settings.POSTGRES_SERVER = os.environ["TEST_POSTGRES_SERVER"]
+    settings.POSTGRES_PORT = int(os.environ.get("TEST_POSTGRES_PORT", 5432))
+    settings.POSTGRES_PGBOUNCER = False
+
+# Under pytest-xdist every worker gets a database of its own, so the cleanup in
+# one worker's db fixture can't delete rows another worker is using. The name
+# has to be switched before app.core.db builds the engine from it.
+MAIN_POSTGRES_DB = settings.POSTGRES_DB
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+if XDIST_WORKER:
+    settings.POSTGRES_DB = f"{MAIN_POSTGRES_DB}_test_{XDIST_WORKER}"
+
+from app import crud  # noqa: E402
+from app.core import security  # noqa: E402
+from app.core.db import engine, init_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Item, User, UserCreate, Appointment, NutritionRecord, Availability, Profile  # noqa: E402
+from app.tests.utils.user import authentication_token_from_email  # noqa: E402
+from app.tests.utils.utils import get_superuser_token_headers, random_lower_string  # noqa: E402
+
+BACKEND_DIR = Path(__file__).parents[2]
+
+
+def create_worker_database() -> None:
+    """Create this xdist worker's database if it doesn't exist and migrate it to head"""
+    main_url = make_url(str(settings.SQLALCHEMY_DATABASE_URI)).set(database=MAIN_POSTGRES_DB)
+    admin_engine = create_engine(main_url, isolation_level="AUTOCOMMIT")
+    with admin_engine.connect() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM pg_database WHERE datname = :name"),
+            {"name": settings.POSTGRES_DB}
+        ).scalar()
+        if not exists:
+            connection.execute(text(f'CREATE DATABASE "{settings.POSTGRES_DB}"'))
+    admin_engine.dispose()
+
+    # Kept between runs, so later runs only check the revision
+    alembic_config = Config(str(BACKEND_DIR / "alembic.ini"))
+    alembic_config.set_main_option("script_location", str(BACKEND_DIR / "app" / "alembic"))
+    command.upgrade(alembic_config, "head")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing() -> Generator[None, None, None]:
+    # bcrypt's minimum cost, test users don't need a slow hash
+    security.pwd_context.update(bcrypt__rounds=4)
+    yield
+    security.pwd_context.update(bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 
 @pytest.fixture(scope="session", autouse=True)
 def db() -> Generator[Session, None, None]:
+    if XDIST_WORKER:
+        create_worker_database()
     with Session(engine) as session:
         init_db(session)
         yield session
@@ -55,3 +110,13 @@ def normal_user_token_headers(client: TestClient, db: Session) -> dict[str, str]
     return authentication_token_from_email(
         client=client, email=settings.EMAIL_TEST_USER, db=db
     )
+
+
+@pytest.fixture(scope="module")
+def normal_user_id(db: Session) -> uuid.UUID:
+    user_id = db.exec(select(User.id).where(User.email == settings.EMAIL_TEST_USER)).first()
+    if user_id is None:
+        # Created the same way as by authentication_token_from_email, which reuses it
+        user_in = UserCreate(email=settings.EMAIL_TEST_USER, password=random_lower_string())
+        user_id = crud.create_user(session=db, user_create=user_in).id
+    return user_id
@@ -89,3 +89,19 @@ def test_update_user(db: Session) -> None:
     assert user_2
     assert user.email == user_2.email
     assert verify_password(new_password, user_2.hashed_password)
+
+
+def test_get_user_cached_invalidated_on_update(db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=email, password=password)
+    user = crud.create_user(session=db, user_create=user_in)
+    cached_user = crud.get_user_cached(session=db, user_id=user.id)
+    assert cached_user
+    assert cached_user.email == email
+    assert crud.get_user_cached(session=db, user_id=user.id) is cached_user
+    user_in_update = UserUpdate(full_name="Cached Name")
+    crud.update_user(session=db, db_user=user, user_in=user_in_update)
+    cached_user_2 = crud.get_user_cached(session=db, user_id=user.id)
+    assert cached_user_2
+    assert cached_user_2.full_name == "Cached Name"
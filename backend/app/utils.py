@@ -1,18 +1,25 @@
 import logging
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from functools import cache
+from operator import attrgetter
 from pathlib import Path
-from typing import Any
+from typing import Any, TypeVar
 
 import emails  # type: ignore
 import jwt
-from jinja2 import Template
+from fastapi import Response
+from jinja2 import Environment, FileSystemLoader
 from jwt.exceptions import InvalidTokenError
+from pydantic import BaseModel
 
 from app.core import security
 from app.core.config import settings
 from app.models import Appointment
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -23,11 +30,16 @@ class EmailData:
     subject: str
 
 
+# Templates are compiled on first use and kept in the environment's cache
+email_templates = Environment(
+    loader=FileSystemLoader(Path(__file__).parent / "email-templates" / "build"),
+    auto_reload=False,
+    cache_size=400,
+)
+
+
 def render_email_template(*, template_name: str, context: dict[str, Any]) -> str:
-    template_str = (
-        Path(__file__).parent / "email-templates" / "build" / template_name
-    ).read_text()
-    html_content = Template(template_str).render(context)
+    html_content = email_templates.get_template(template_name).render(context)
     return html_content
 
 
@@ -249,4 +261,39 @@ def generate_cancellation_email(
                 "other_name": client_name,
             },
         )
-    return EmailData(html_content=html_content, subject=subject)
\ No newline at end of file
+    return EmailData(html_content=html_content, subject=subject)
+
+
+@cache
+def _row_reader(model: type[BaseModel]) -> tuple[tuple[str, ...], Callable[[Any], tuple[Any, ...]]]:
+    fields = tuple(model.model_fields)
+    if len(fields) == 1:
+        # attrgetter returns a bare value for a single name
+        read_one = attrgetter(fields[0])
+        return fields, lambda obj: (read_one(obj),)
+    return fields, attrgetter(*fields)
+
+
+def construct_from_db(model: type[ModelT], obj: Any) -> ModelT:
+    """Build a response model from a database row without validating it again."""
+    fields, read = _row_reader(model)
+    return model.model_construct(**dict(zip(fields, read(obj), strict=True)))
+
+
+def page_response(
+    *,
+    page_model: type[BaseModel],
+    item_model: type[BaseModel],
+    rows: Sequence[Any],
+    count: int,
+) -> Response:
+    """
+    Serialize a page of database rows as a ``{"data": [...], "count": n}`` response.
+
+    Returning the Response directly skips the response_model validation FastAPI would
+    run on every row, the route's response_model still documents the schema.
+    """
+    page = page_model.model_construct(
+        data=[construct_from_db(item_model, row) for row in rows], count=count
+    )
+    return Response(content=page.model_dump_json(), media_type="application/json")